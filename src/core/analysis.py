@@ -0,0 +1,211 @@
+from collections import deque
+
+from .plan import MISSING_NODE, compile_graph
+
+# Node IDs listed per cycle / unreachable set in error and warning messages.
+MESSAGE_NODE_LIMIT = 10
+
+
+class GraphAnalysisError(ValueError):
+    """Raised when a graph cannot be executed safely."""
+    pass
+
+
+class GraphAnalysis:
+    """
+    Result of a static pass over a CompiledPlan.
+
+    `acyclic` is True when no transition leads back to an earlier node.
+    `cycles` lists every strongly connected component that can loop, and
+    `success_cycles` the subset that loops without any failure transition
+    (those can never terminate on their own).
+    """
+    __slots__ = ("entry_missing", "dangling", "unreachable", "cycles", "success_cycles", "acyclic")
+
+    def __init__(self, entry_missing, dangling, unreachable, cycles, success_cycles, acyclic):
+        self.entry_missing = entry_missing
+        self.dangling = dangling
+        self.unreachable = unreachable
+        self.cycles = cycles
+        self.success_cycles = success_cycles
+        self.acyclic = acyclic
+
+    def errors(self, retry_on_fail=False):
+        """Problems that make the graph unsafe to run. Failure-edge loops are bounded by the retry counter."""
+        errors = []
+        if self.entry_missing:
+            errors.append("entry_point is missing or does not name a node")
+        for cycle in self.success_cycles:
+            errors.append(f"unbounded cycle: {_abbreviate(cycle, ' -> ')}")
+        if not retry_on_fail:
+            unbounded = {frozenset(cycle) for cycle in self.success_cycles}
+            for cycle in self.cycles:
+                if frozenset(cycle) not in unbounded:
+                    errors.append(f"cycle through on_failure without retry_on_fail: {_abbreviate(cycle, ' -> ')}")
+        return errors
+
+    def warnings(self):
+        warnings = [f"{node_id}.{field} -> '{target}' does not exist" for node_id, field, target in self.dangling]
+        if self.unreachable:
+            warnings.append(f"unreachable nodes: {_abbreviate(self.unreachable, ', ')}")
+        return warnings
+
+
+def _abbreviate(node_ids, separator, limit=MESSAGE_NODE_LIMIT):
+    """Joins the first `limit` IDs; a 100k-node cycle should not become a 1 MB error message."""
+    if len(node_ids) <= limit:
+        return separator.join(node_ids)
+    return f"{separator.join(node_ids[:limit])}{separator}... ({len(node_ids) - limit} more, {len(node_ids)} nodes)"
+
+
+def _success_edges(node):
+    """The executor's success transition (see PlanNode.success_target) plus depends_on edges."""
+    target = node.success_target()[0]
+    targets = [target] if target >= 0 else []
+    targets.extend(node.dependents)
+    return targets
+
+
+def _successors(plan):
+    """Adjacency lists over every transition the executor can take, with depends_on as dependency -> dependent edges."""
+    adjacency = []
+    for node in plan.nodes:
+        targets = _success_edges(node)
+        if node.on_failure >= 0:
+            targets.append(node.on_failure)
+        adjacency.append(targets)
+    return adjacency
+
+
+def _success_cycles(plan, components):
+    """
+    Cycles left once on_failure edges are dropped. Each one lies inside a cyclic
+    component of the full graph, so only those components are searched again.
+    """
+    cycles = []
+    for component in components:
+        local = {index: i for i, index in enumerate(component)}
+        if not any(plan.nodes[index].on_failure in local for index in component):
+            # No failure edge inside the component: it is a success cycle as it stands.
+            cycles.append(component)
+            continue
+        adjacency = []
+        for index in component:
+            adjacency.append([local[t] for t in _success_edges(plan.nodes[index]) if t in local])
+        cycles.extend([component[i] for i in cycle] for cycle in _cyclic_components(adjacency))
+    return cycles
+
+
+def _is_acyclic(adjacency):
+    """Kahn's algorithm, counting only: True when every node can be ordered."""
+    indegree = [0] * len(adjacency)
+    for targets in adjacency:
+        for target in targets:
+            indegree[target] += 1
+
+    queue = [i for i, degree in enumerate(indegree) if degree == 0]
+    ordered = 0
+    while queue:
+        ordered += 1
+        for target in adjacency[queue.pop()]:
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+
+    return ordered == len(adjacency)
+
+
+def _cyclic_components(adjacency):
+    """Iterative Tarjan SCC. Returns components that contain a cycle, as lists of indexes."""
+    count = len(adjacency)
+    index_of = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if index_of[root] != -1:
+            continue
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # Each frame holds a live iterator over the node's targets, so resuming a
+        # node after its child returns costs nothing extra.
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, targets = work[-1]
+            for target in targets:
+                if index_of[target] == -1:
+                    index_of[target] = lowlink[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, iter(adjacency[target])))
+                    break
+                if on_stack[target] and index_of[target] < lowlink[node]:
+                    lowlink[node] = index_of[target]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in adjacency[node]:
+                        component.reverse()
+                        components.append(component)
+
+    return components
+
+
+def analyze_plan(plan):
+    """O(V+E) analysis of a compiled plan. Cached on the plan, so repeat runs are free."""
+    if plan.analysis is not None:
+        return plan.analysis
+
+    adjacency = _successors(plan)
+    ids = [node.node_id for node in plan.nodes]
+
+    reachable = [False] * len(adjacency)
+    if plan.entry >= 0:
+        reachable[plan.entry] = True
+        queue = deque([plan.entry])
+        while queue:
+            for target in adjacency[queue.popleft()]:
+                if not reachable[target]:
+                    reachable[target] = True
+                    queue.append(target)
+
+    acyclic = _is_acyclic(adjacency)
+    cycles = success_cycles = []
+    if not acyclic:
+        # Only pay for SCC detection when Kahn's pass found a cycle.
+        components = _cyclic_components(adjacency)
+        cycles = [[ids[i] for i in c] for c in components]
+        success_cycles = [[ids[i] for i in c] for c in _success_cycles(plan, components)]
+
+    plan.analysis = GraphAnalysis(
+        entry_missing=plan.entry == MISSING_NODE,
+        dangling=list(plan.dangling),
+        unreachable=[ids[i] for i, seen in enumerate(reachable) if not seen],
+        cycles=cycles,
+        success_cycles=success_cycles,
+        acyclic=acyclic,
+    )
+    return plan.analysis
+
+
+def analyze_graph(graph):
+    """Compiles (or fetches the cached plan for) a graph dict and analyzes it."""
+    return analyze_plan(compile_graph(graph))
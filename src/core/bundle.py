@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from .tools.fileio import create_temp
+
+logger = logging.getLogger("Axion.Bundle")
+
+BUNDLE_NAME = "personas.bundle"
+# Markdown under these .agents subdirectories (plus the top-level files) is packed.
+BUNDLE_DIRS = ("config", "workflows", "rules")
+BUNDLE_FILES = ("COMMANDS.md",)
+
+MAGIC = b"AXBUNDL1"
+# magic, index length; the JSON index follows, then the packed file data.
+_HEADER = struct.Struct(">8sQ")
+
+
+def bundle_sources(agents_dir):
+    """Relative ("/"-separated) paths of every file that goes into the bundle, sorted."""
+    paths = [name for name in BUNDLE_FILES if os.path.isfile(os.path.join(agents_dir, name))]
+    for directory in BUNDLE_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(agents_dir, directory)):
+            dirnames.sort()
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    relpath = os.path.relpath(os.path.join(dirpath, filename), agents_dir)
+                    paths.append(relpath.replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def build_bundle(agents_dir, output_path=None):
+    """
+    Packs personas, workflows, rules and TECH_STACK.md into one file.
+
+    The index maps each relative path to [offset, length, sha256, mtime_ns, size];
+    offsets are relative to the start of the data section. Each entry records
+    the source file's stat so readers can tell when it has gone stale.
+    Returns the bundle path.
+    """
+    output_path = output_path or os.path.join(agents_dir, BUNDLE_NAME)
+    index = {}
+    chunks = []
+    offset = 0
+    for relpath in bundle_sources(agents_dir):
+        with open(os.path.join(agents_dir, relpath), 'rb') as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        index[relpath] = [offset, len(data), hashlib.sha256(data).hexdigest(), st.st_mtime_ns, st.st_size]
+        chunks.append(data)
+        offset += len(data)
+
+    index_bytes = json.dumps({"files": index}, sort_keys=True, separators=(",", ":")).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = create_temp(directory, target=output_path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, len(index_bytes)))
+            f.write(index_bytes)
+            for data in chunks:
+                f.write(data)
+        os.replace(tmp_path, output_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Bundled {len(index)} files into {output_path}")
+    return output_path
+
+
+class PersonaBundle:
+    """
+    Read-only, mmap-backed view of a bundle built by build_bundle().
+    view() slices a file out without copying; entries are only trusted while
+    the loose source file's (mtime_ns, size) still match what was packed.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, index_length = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a persona bundle.")
+            index_end = _HEADER.size + index_length
+            self.files = json.loads(self._mmap[_HEADER.size:index_end])["files"]
+        except Exception:
+            self._mmap.close()
+            raise
+        self._data = memoryview(self._mmap)[index_end:]
+
+    @classmethod
+    def open(cls, agents_dir):
+        """The bundle in `agents_dir`, or None if there is none (or it is unreadable)."""
+        path = os.path.join(agents_dir, BUNDLE_NAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable persona bundle {path}: {e}")
+            return None
+
+    def __contains__(self, relpath):
+        return relpath in self.files
+
+    def is_fresh(self, relpath, mtime_ns, size):
+        entry = self.files.get(relpath)
+        return entry is not None and entry[3] == mtime_ns and entry[4] == size
+
+    def view(self, relpath):
+        """Zero-copy memoryview of a packed file. Must not outlive close()."""
+        offset, length = self.files[relpath][:2]
+        return self._data[offset:offset + length]
+
+    def text(self, relpath):
+        """Decoded like a text-mode read (universal newlines), so it matches the loose file."""
+        text = str(self.view(relpath), 'utf-8')
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def content_hash(self, relpath):
+        return self.files[relpath][2]
+
+    def close(self):
+        self._data.release()
+        self._mmap.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack .agents personas, workflows and rules into one bundle")
+    parser.add_argument("--agents", type=str, help="The .agents directory (default: auto-detected)")
+    parser.add_argument("--output", type=str, help=f"Bundle path (default: <agents>/{BUNDLE_NAME})")
+    args = parser.parse_args()
+
+    agents_dir = args.agents
+    if agents_dir is None:
+        from .context import ContextLoader
+        agents_dir = ContextLoader().agents_dir
+    path = build_bundle(agents_dir, args.output)
+    print(f"✅ Wrote {path}")
+
+if __name__ == "__main__":
+    sys.exit(main())
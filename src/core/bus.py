@@ -1,8 +1,68 @@
+import functools
 import json
 import os
+import threading
+from collections import OrderedDict
+
 import jsonschema
 
+from . import tracing
+from .plan import ACTIONS, MISSING_NODE, NO_NODE, TERMINATE, compile_graph, content_hash
+
+VALIDATED_CACHE_SIZE = 1024
+
+_STRING_FIELDS = ("graph_id", "intent_glyph", "aether_mark", "entry_point")
+_NODE_STRING_FIELDS = ("next", "on_success", "on_failure")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_validator(schema_path):
+    """Loads the schema and builds its validator once per process."""
+    with open(schema_path, 'r') as f:
+        schema = json.load(f)
+
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return schema, validator_cls(schema)
+
+
+def _precheck(graph_data):
+    """
+    Hand-written checks for the structural errors seen most often.
+    Cheaply rejects bad graphs before the full schema validator runs.
+    """
+    if not isinstance(graph_data, dict):
+        raise jsonschema.ValidationError(f"{graph_data!r} is not of type 'object'")
+
+    for field in ("graph_id", "intent_glyph", "nodes", "entry_point"):
+        if field not in graph_data:
+            raise jsonschema.ValidationError(f"'{field}' is a required property")
+
+    for field in _STRING_FIELDS:
+        if field in graph_data and not isinstance(graph_data[field], str):
+            raise jsonschema.ValidationError(f"{graph_data[field]!r} is not of type 'string'")
+
+    nodes = graph_data["nodes"]
+    if not isinstance(nodes, dict):
+        raise jsonschema.ValidationError(f"{nodes!r} is not of type 'object'")
+
+    for node in nodes.values():
+        if not isinstance(node, dict):
+            raise jsonschema.ValidationError(f"{node!r} is not of type 'object'")
+        if "action" not in node:
+            raise jsonschema.ValidationError("'action' is a required property")
+        if node["action"] not in ACTIONS:
+            raise jsonschema.ValidationError(f"{node['action']!r} is not one of {list(ACTIONS)!r}")
+        for field in _NODE_STRING_FIELDS:
+            if field in node and not isinstance(node[field], str):
+                raise jsonschema.ValidationError(f"{node[field]!r} is not of type 'string'")
+
+
 class NexusBus:
+    # Content hashes of graphs that already passed validation, shared by every bus in the process.
+    _validated = OrderedDict()
+    _validated_lock = threading.Lock()
+
     def __init__(self):
         # Locate the schema file relative to this file
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,52 +71,96 @@ class NexusBus:
         if not os.path.exists(schema_path):
              raise FileNotFoundError(f"Schema file not found at: {schema_path}")
 
-        with open(schema_path, 'r') as f:
-            self.schema = json.load(f)
+        self.schema, self._validator = _load_validator(schema_path)
 
     def validate_graph(self, graph_data):
         """Validates the given graph data against the Sovereign Execution Graph schema."""
+        with tracing.span("validate_graph", "validation"):
+            return self._validate_graph(graph_data)
+
+    def _validate_graph(self, graph_data):
+        # Hashing is a small, size-independent fraction of validating, so every graph is memoised.
         try:
-            jsonschema.validate(instance=graph_data, schema=self.schema)
+            digest = content_hash(graph_data)
+        except (TypeError, ValueError):
+            # Not JSON-serialisable: cannot be memoised, let the validator report it.
+            digest = None
+
+        if digest is not None and self._is_known_valid(digest):
             print("[VALIDATION] Graph structure is valid.")
             return True
+
+        try:
+            _precheck(graph_data)
+            self._validator.validate(graph_data)
+            print("[VALIDATION] Graph structure is valid.")
         except jsonschema.ValidationError as e:
             print(f"[VALIDATION ERROR] {e.message}")
             raise e
 
+        if digest is not None:
+            self._remember_valid(digest)
+        return True
+
+    @classmethod
+    def clear_validation_cache(cls):
+        with cls._validated_lock:
+            cls._validated.clear()
+
+    @classmethod
+    def _is_known_valid(cls, digest):
+        with cls._validated_lock:
+            if digest in cls._validated:
+                cls._validated.move_to_end(digest)
+                return True
+        return False
+
+    @classmethod
+    def _remember_valid(cls, digest):
+        with cls._validated_lock:
+            cls._validated[digest] = True
+            if len(cls._validated) > VALIDATED_CACHE_SIZE:
+                cls._validated.popitem(last=False)
+
     def execute(self, graph_data):
         """Traverses the graph and simulates execution."""
+        with tracing.span(str(graph_data.get('graph_id', 'unknown')), "graph"):
+            self._execute(graph_data)
+
+    def _execute(self, graph_data):
         # 1. Validate
         self.validate_graph(graph_data)
 
         # 2. Start Traversal
-        current_node_id = graph_data.get('entry_point')
-        nodes = graph_data.get('nodes', {})
+        plan = compile_graph(graph_data)
+        nodes = plan.nodes
+        current = plan.entry
 
-        print(f"[NEXUS] Starting execution at entry point: {current_node_id}")
+        print(f"[NEXUS] Starting execution at entry point: {plan.entry_point}")
 
-        while current_node_id:
-            node = nodes.get(current_node_id)
-            if not node:
-                print(f"[ERROR] Node '{current_node_id}' not found in graph.")
-                break
+        if current == MISSING_NODE:
+            print(f"[ERROR] Node '{plan.entry_point}' not found in graph.")
+            return
 
-            action = node.get('action')
-            print(f"[EXECUTING] Node {current_node_id}: {action}")
+        while current >= 0:
+            node = nodes[current]
+            print(f"[EXECUTING] Node {node.node_id}: {node.action}")
 
             # Simulate logic / Determine next node
-            if action == 'terminate':
+            if node.action_code == TERMINATE:
                 print("[NEXUS] Terminate action reached. Stopping.")
                 break
 
             # Simple traversal logic (Happy Path)
-            next_node = node.get('next')
-            if not next_node:
+            if node.next_id:
+                current, target_id = node.next, node.next_id
+            else:
                 # If no unconditional jump, check for on_success
-                next_node = node.get('on_success')
+                current, target_id = node.on_success, node.on_success_id
 
-            if next_node:
-                current_node_id = next_node
-            else:
-                print(f"[NEXUS] No next node defined for {current_node_id}. Stopping.")
+            if current == MISSING_NODE:
+                print(f"[ERROR] Node '{target_id}' not found in graph.")
+                break
+            if current == NO_NODE:
+                print(f"[NEXUS] No next node defined for {node.node_id}. Stopping.")
                 break
@@ -0,0 +1,213 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from .context import get_loader
+from .tools.fileio import create_temp
+
+logger = logging.getLogger("Axion.Commands")
+
+INDEX_NAME = "commands.index.json"
+INDEX_VERSION = 1
+
+# | **/standup** `[topic]` | `workflows/standup.md` | **Brain** convenes the squad ... |
+_ROW = re.compile(r"^\|\s*\*\*(/[\w-]+)\*\*\s*(?:`\[([^\]]*)\]`)?\s*\|\s*`?([^|`]*?)`?\s*\|\s*(.*?)\s*\|\s*$")
+_MARKUP = re.compile(r"\*\*|`")
+
+
+def _normalize(name):
+    name = name.strip().lower()
+    return name if name.startswith("/") else f"/{name}"
+
+
+def parse_commands(markdown, known_agents=()):
+    """
+    Parses the COMMANDS.md table into command dicts:
+    {name, argument, trigger, description, agents}. `trigger` is relative to the
+    .agents directory (None for "N/A"); `agents` are the known agent names the
+    description mentions, in order of appearance.
+    """
+    agent_pattern = None
+    if known_agents:
+        agent_pattern = re.compile(r"\b(" + "|".join(map(re.escape, sorted(known_agents))) + r")\b", re.IGNORECASE)
+
+    commands = []
+    for line in markdown.splitlines():
+        match = _ROW.match(line.strip())
+        if not match:
+            continue
+        name, argument, trigger, description = match.groups()
+        trigger = trigger.strip()
+        if not trigger or trigger.upper() == "N/A":
+            trigger = None
+        elif trigger.startswith(".agents/"):
+            trigger = trigger[len(".agents/"):]
+
+        agents = []
+        if agent_pattern is not None:
+            for agent in agent_pattern.findall(description):
+                if agent.lower() not in agents:
+                    agents.append(agent.lower())
+
+        commands.append({
+            "name": name.lower(),
+            "argument": argument or None,
+            "trigger": trigger,
+            "description": _MARKUP.sub("", description).strip(),
+            "agents": agents,
+        })
+    return commands
+
+
+def _known_agents(agents_dir):
+    """Agent names: the persona files directly under config/ (TECH_STACK.md excluded)."""
+    config_dir = os.path.join(agents_dir, 'config')
+    try:
+        names = os.listdir(config_dir)
+    except OSError:
+        return []
+    return sorted(name[:-3].lower() for name in names if name.endswith(".md") and name != "TECH_STACK.md")
+
+
+def default_index_path(agents_dir):
+    """
+    Where the index for `agents_dir` is cached: $XDG_CACHE_HOME/axion (default
+    ~/.cache/axion), one subdirectory per .agents path. Keeping it out of .agents
+    means it is never copied into projects scaffolded from template_source.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.sha256(os.path.abspath(agents_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(base, "axion", digest, INDEX_NAME)
+
+
+def _index_key(agents_dir):
+    """
+    Directory mtimes cover files being added, removed or renamed; COMMANDS.md's own
+    stat covers edits to the table. The .agents directory itself is left out: the
+    persona bundle is written there.
+    """
+    key = []
+    for relpath in ("config", os.path.join("config", "defaults"), "workflows", "COMMANDS.md"):
+        try:
+            st = os.stat(os.path.join(agents_dir, relpath))
+            key.append([relpath, st.st_mtime_ns, st.st_size if relpath == "COMMANDS.md" else 0])
+        except OSError:
+            key.append([relpath, None, None])
+    return key
+
+
+class WorkflowRegistry:
+    """
+    Runtime index of the slash commands in COMMANDS.md: O(1) lookup by name and
+    prefix search over the sorted names. Each command records its workflow file,
+    the matching config/defaults persona (if any) and the agents involved.
+    """
+    def __init__(self, agents_dir, commands):
+        self.agents_dir = agents_dir
+        self._commands = {command["name"]: command for command in commands}
+        self._names = sorted(self._commands)
+
+    @classmethod
+    def build(cls, agents_dir):
+        commands_path = os.path.join(agents_dir, 'COMMANDS.md')
+        with open(commands_path, 'r', encoding='utf-8') as f:
+            commands = parse_commands(f.read(), _known_agents(agents_dir))
+        for command in commands:
+            stem = os.path.splitext(os.path.basename(command["trigger"] or ""))[0]
+            defaults = os.path.join('config', 'defaults', f'{stem}.md') if stem else None
+            command["defaults"] = defaults if defaults and os.path.exists(os.path.join(agents_dir, defaults)) else None
+        return cls(agents_dir, commands)
+
+    @classmethod
+    def load(cls, agents_dir, index_path=None):
+        """
+        The registry for `agents_dir`, read from the on-disk index when its key
+        (directory mtimes) still matches, otherwise rebuilt and re-saved.
+        """
+        index_path = index_path or default_index_path(agents_dir)
+        key = _index_key(agents_dir)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("version") == INDEX_VERSION and cached.get("key") == key:
+                return cls(agents_dir, cached["commands"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable command index {index_path}: {e}")
+
+        registry = cls.build(agents_dir)
+        registry._save(index_path, key)
+        return registry
+
+    def _save(self, index_path, key):
+        payload = {"version": INDEX_VERSION, "key": key, "commands": [self._commands[n] for n in self._names]}
+        tmp_path = None
+        try:
+            directory = os.path.dirname(os.path.abspath(index_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = create_temp(directory, target=index_path)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"Could not persist command index {index_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def __contains__(self, name):
+        return _normalize(name) in self._commands
+
+    def __len__(self):
+        return len(self._names)
+
+    def names(self):
+        return list(self._names)
+
+    def lookup(self, name):
+        """The command dict for "/standup" (or "standup"), or None."""
+        return self._commands.get(_normalize(name))
+
+    def search(self, prefix):
+        """Command names starting with `prefix`, sorted."""
+        prefix = _normalize(prefix)
+        start = bisect.bisect_left(self._names, prefix)
+        end = bisect.bisect_left(self._names, prefix + "\uffff", start)
+        return self._names[start:end]
+
+    def resolve(self, text):
+        """
+        Splits "/standup caching strategy" into (command dict, "caching strategy").
+        Returns (None, text) when the text does not start with a known command.
+        """
+        head, _, rest = text.strip().partition(" ")
+        command = self.lookup(head) if head.startswith("/") else None
+        if command is None:
+            return None, text
+        return command, rest.strip()
+
+    def workflow_path(self, name):
+        command = self.lookup(name)
+        if command is None or command["trigger"] is None:
+            return None
+        return os.path.join(self.agents_dir, command["trigger"])
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_workflow_registry(agents_dir=None):
+    """Process-wide registry, built (or loaded from the on-disk index) on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                if agents_dir is None:
+                    agents_dir = get_loader().agents_dir
+                _registry = WorkflowRegistry.load(agents_dir)
+    return _registry
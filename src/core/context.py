@@ -1,9 +1,34 @@
 import os
+import threading
+
+from .bundle import PersonaBundle
+from .prompt import Section, diff_sections, estimate_tokens, select_sections, split_sections
+
+TECH_STACK_HEADER = "\n\n## Technology Stack\n"
+TECH_STACK_HEADER_ID = "header:Technology Stack"
+TECH_STACK_SECTION = Section(0, "Technology Stack", 2, 0, len(TECH_STACK_HEADER), TECH_STACK_HEADER, None)
 
 class ContextLoader:
-    def __init__(self):
-        self.root_dir = self._find_root()
+    """
+    Loads agent personas and the tech stack from the .agents directory.
+
+    File contents and assembled contexts are cached and revalidated with a
+    stat per file on every call, so edits (or toggle_defcon.py renaming
+    boom.md away) take effect without a restart, and repeated calls for an
+    unchanged agent never read from disk.
+
+    When a persona bundle has been built (python -m src.core.bundle), file
+    contents are sliced out of it instead of opening each loose file; any file
+    edited since the bundle was built is read loose instead.
+    """
+    def __init__(self, root_dir=None, use_bundle=True):
+        self.root_dir = root_dir or self._find_root()
         self.agents_dir = self._find_agents_dir()
+        self.bundle = PersonaBundle.open(self.agents_dir) if use_bundle else None
+        self._files = {}     # path -> (fingerprint, content)
+        self._sections = {}  # path -> (fingerprint, [Section])
+        self._contexts = {}  # agent -> (fingerprints, context)
+        self._lock = threading.Lock()
 
     def _find_root(self):
         # Assumes src/core/context.py
@@ -23,41 +48,198 @@ class ContextLoader:
 
         raise FileNotFoundError(f"Could not locate .agents configuration directory. Searched: {prod_path}, {dev_path}")
 
-    def load_persona(self, agent_name):
-        """Reads the corresponding .md file for the agent."""
-        # Normalize name
-        agent_name = agent_name.lower()
-        filepath = os.path.join(self.agents_dir, 'config', 'defaults', f'{agent_name}.md')
+    def _persona_path(self, agent_name):
+        return os.path.join(self.agents_dir, 'config', 'defaults', f'{agent_name.lower()}.md')
+
+    def _tech_stack_path(self):
+        return os.path.join(self.agents_dir, 'config', 'TECH_STACK.md')
 
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"Persona file not found: {filepath}")
+    def _fingerprint(self, filepath, missing_message):
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            raise FileNotFoundError(missing_message) from None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
+    def _read(self, filepath, fingerprint):
+        with self._lock:
+            cached = self._files.get(filepath)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        relpath = os.path.relpath(filepath, self.agents_dir).replace(os.sep, '/')
+        if self.bundle is not None and self.bundle.is_fresh(relpath, fingerprint[0], fingerprint[1]):
+            content = self.bundle.text(relpath)
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+        with self._lock:
+            self._files[filepath] = (fingerprint, content)
+        return content
+
+    def load_persona(self, agent_name):
+        """Reads the corresponding .md file for the agent."""
+        filepath = self._persona_path(agent_name)
+        fingerprint = self._fingerprint(filepath, f"Persona file not found: {filepath}")
+        return self._read(filepath, fingerprint)
 
     def load_tech_stack(self):
         """Reads TECH_STACK.md."""
-        filepath = os.path.join(self.agents_dir, 'config', 'TECH_STACK.md')
+        filepath = self._tech_stack_path()
+        fingerprint = self._fingerprint(filepath, f"TECH_STACK.md not found at {filepath}")
+        return self._read(filepath, fingerprint)
 
-        if not os.path.exists(filepath):
-             raise FileNotFoundError(f"TECH_STACK.md not found at {filepath}")
+    def load_file(self, relpath):
+        """Reads any file under the .agents directory (e.g. "workflows/standup.md"), cached like personas."""
+        filepath = os.path.join(self.agents_dir, relpath)
+        fingerprint = self._fingerprint(filepath, f"Agent file not found: {filepath}")
+        return self._read(filepath, fingerprint)
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
+    def _section_index(self, filepath, fingerprint):
+        """Markdown-heading sections of a file, computed once per file version."""
+        with self._lock:
+            cached = self._sections.get(filepath)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        sections = split_sections(self._read(filepath, fingerprint))
+        with self._lock:
+            self._sections[filepath] = (fingerprint, sections)
+        return sections
 
-    def build_system_context(self, agent_name):
-        """Combines persona and tech stack into a system prompt dictionary."""
-        persona_content = self.load_persona(agent_name)
-        tech_stack_content = self.load_tech_stack()
+    def build_system_context(self, agent_name, token_budget=None, priorities=None):
+        """
+        Combines persona and tech stack into a system prompt dictionary.
 
+        With a `token_budget`, the system prompt keeps whole markdown sections by
+        priority (lower first; by default persona before tech stack, shallower
+        headings before deeper ones) until the estimated token count would exceed
+        the budget. `priorities` maps heading titles (case-insensitive) to a
+        priority that overrides the default. Dropped sections are reported.
+
+        `section_hashes` maps each section of the system prompt (e.g.
+        "tech_stack:Stack/Details") to a content hash, in prompt order; see context_delta().
+        """
+        return self._assemble(agent_name, token_budget, priorities)[0]
+
+    def context_delta(self, agent_name, previous_hashes, token_budget=None, priorities=None):
+        """
+        Only what changed since a caller sent the prompt described by `previous_hashes`
+        (an earlier context's `section_hashes`): added and changed sections with their
+        text, removed section ids, plus the new manifest and section order so the caller
+        can rebuild the full prompt.
+        """
+        context, sections = self._assemble(agent_name, token_budget, priorities)
+        added, changed, removed = diff_sections(previous_hashes or {}, sections)
         return {
             "role": agent_name,
-            "persona": persona_content,
-            "tech_stack": tech_stack_content,
-            "system_prompt": f"{persona_content}\n\n## Technology Stack\n{tech_stack_content}"
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "order": [section_id for section_id, _ in sections],
+            "section_hashes": context["section_hashes"],
         }
 
+    def _assemble(self, agent_name, token_budget, priorities):
+        """Returns (context, [(section_id, Section)] of its system prompt in order)."""
+        persona_path = self._persona_path(agent_name)
+        tech_path = self._tech_stack_path()
+        fingerprints = (
+            self._fingerprint(persona_path, f"Persona file not found: {persona_path}"),
+            self._fingerprint(tech_path, f"TECH_STACK.md not found at {tech_path}"),
+        )
+        if token_budget is not None:
+            return self._budgeted_context(agent_name, persona_path, tech_path, fingerprints,
+                                          token_budget, priorities or {})
+
+        with self._lock:
+            cached = self._contexts.get(agent_name)
+        if cached is None or cached[0] != fingerprints:
+            persona_content = self._read(persona_path, fingerprints[0])
+            tech_stack_content = self._read(tech_path, fingerprints[1])
+            sections = [(key, section) for key, section, _, _ in
+                        self._candidates(persona_path, tech_path, fingerprints, lambda section, offset: 0)]
+            context = {
+                "role": agent_name,
+                "persona": persona_content,
+                "tech_stack": tech_stack_content,
+                "system_prompt": f"{persona_content}{TECH_STACK_HEADER}{tech_stack_content}",
+                "section_hashes": {key: section.digest for key, section in sections},
+            }
+            cached = (fingerprints, context, sections)
+            with self._lock:
+                self._contexts[agent_name] = cached
+
+        context = dict(cached[1])
+        context["section_hashes"] = dict(context["section_hashes"])
+        return context, cached[2]
+
+    def _candidates(self, persona_path, tech_path, fingerprints, priority):
+        """(section_id, Section, priority, parent_id) for every prompt section, in prompt order."""
+        candidates = []
+        persona_sections = self._section_index(persona_path, fingerprints[0])
+        for section in persona_sections:
+            parent = f"persona:{persona_sections[section.parent].path}" if section.parent is not None else None
+            candidates.append((f"persona:{section.path}", section, priority(section, 0), parent))
+        # The "## Technology Stack" join line is a section too: tech stack sections hang off it.
+        candidates.append((TECH_STACK_HEADER_ID, TECH_STACK_SECTION, priority(TECH_STACK_SECTION, 0), None))
+        tech_sections = self._section_index(tech_path, fingerprints[1])
+        for section in tech_sections:
+            if section.parent is not None:
+                parent = f"tech_stack:{tech_sections[section.parent].path}"
+            else:
+                parent = TECH_STACK_HEADER_ID
+            candidates.append((f"tech_stack:{section.path}", section, priority(section, 1), parent))
+        return candidates
+
+    def _budgeted_context(self, agent_name, persona_path, tech_path, fingerprints, budget, priorities):
+        overrides = {title.lower(): priority for title, priority in priorities.items()}
+
+        def priority(section, offset):
+            default = (0 if section.level <= 1 else section.level - 1) + offset
+            return overrides.get(section.title.lower(), default)
+
+        candidates = self._candidates(persona_path, tech_path, fingerprints, priority)
+        kept, dropped = select_sections(candidates, budget)
+        sections = [(key, section) for key, section, _, _ in candidates if key in kept]
+        prompt = "".join(section.text for _, section in sections)
+        context = {
+            "role": agent_name,
+            "persona": self._read(persona_path, fingerprints[0]),
+            "tech_stack": self._read(tech_path, fingerprints[1]),
+            "system_prompt": prompt,
+            "section_hashes": {key: section.digest for key, section in sections},
+            "estimated_tokens": estimate_tokens(prompt),
+            "dropped_sections": [
+                {"source": key.split(":", 1)[0], "title": section.title, "level": section.level,
+                 "tokens": section.tokens}
+                for key, section, _, _ in candidates if key in dropped
+            ],
+        }
+        return context, sections
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._sections.clear()
+            self._contexts.clear()
+
+# Process-wide loader shared by load_context().
+_loader = None
+_loader_lock = threading.Lock()
+
+def get_loader():
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = ContextLoader()
+    return _loader
+
+def reset_loader():
+    """Drops the shared loader; the next load_context() re-locates the .agents directory."""
+    global _loader
+    with _loader_lock:
+        _loader = None
+
 # Module-level helper
 def load_context(agent_name):
-    loader = ContextLoader()
-    return loader.build_system_context(agent_name)
+    return get_loader().build_system_context(agent_name)
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("Axion.Journal")
+
+
+class JournalState:
+    """What a journal says about a previous run, as needed to resume it."""
+    __slots__ = ("digest", "graph_id", "results", "context", "next_node_id", "finished", "status")
+
+    def __init__(self):
+        self.digest = None
+        self.graph_id = None
+        self.results = {}
+        self.context = None
+        self.next_node_id = None
+        self.finished = False
+        self.status = None
+
+
+def _truncate_torn_tail(path, chunk_size=4096):
+    """
+    Cuts a crash-torn final line off an existing journal so appended records start
+    on a fresh line (otherwise they would be glued onto the partial record).
+    """
+    try:
+        f = open(path, 'r+b')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            position = start
+        else:
+            keep = 0
+        if keep != end:
+            logger.warning(f"Truncating torn final record in {path} ({end - keep} bytes)")
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ExecutionJournal:
+    """
+    Append-only JSONL record of a graph run.
+
+    Records are buffered and written + fsynced in groups (every `group_size`
+    records or `group_interval` seconds, whichever comes first), so
+    checkpointing costs one fsync per group instead of one per node. Only
+    records that reached disk count as committed; a torn final line left by a
+    crash is ignored on load.
+    """
+    def __init__(self, path, group_size=32, group_interval=0.05):
+        self.path = path
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._last_context = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        _truncate_torn_tail(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def begin(self, digest, graph_id, context):
+        self._append({"t": "start", "digest": digest, "graph_id": graph_id, "context": context})
+        self._last_context = json.dumps(context, sort_keys=True)
+
+    def record_node(self, node_id, result, next_node_id, context):
+        """Checkpoints a completed node. The context is only stored when it changed."""
+        record = {"t": "node", "node": node_id, "result": result, "next": next_node_id}
+        snapshot = json.dumps(context, sort_keys=True)
+        if snapshot != self._last_context:
+            record["context"] = context
+            self._last_context = snapshot
+        self._append(record)
+
+    def finish(self, status):
+        self._append({"t": "end", "status": status})
+        self.flush()
+
+    def flush(self):
+        """Writes buffered records and fsyncs them (group commit)."""
+        with self._lock:
+            if not self._buffer:
+                return
+            self._file.write("".join(self._buffer))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer.clear()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, record):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            due = (len(self._buffer) >= self.group_size
+                   or time.monotonic() - self._last_flush >= self.group_interval)
+        if due:
+            self.flush()
+
+    @staticmethod
+    def load(path):
+        """Replays a journal into a JournalState."""
+        state = JournalState()
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        for number, line in enumerate(lines, start=1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if number == len(lines):
+                    logger.warning(f"Ignoring torn final record in {path}")
+                    break
+                raise ValueError(f"Corrupt journal record at {path}:{number}")
+
+            kind = record.get("t")
+            if kind == "start":
+                # A restarted run appends a fresh start record; only the latest run counts.
+                state = JournalState()
+                state.digest = record["digest"]
+                state.graph_id = record.get("graph_id")
+                state.context = record.get("context", {})
+            elif kind == "node":
+                state.results[record["node"]] = record["result"]
+                state.next_node_id = record["next"]
+                if "context" in record:
+                    state.context = record["context"]
+            elif kind == "end":
+                state.finished = True
+                state.status = record.get("status")
+
+        return state
@@ -0,0 +1,241 @@
+import bisect
+import os
+import threading
+
+from .tools.fileio import create_temp
+
+# Latency bucket upper bounds in seconds (Prometheus-style; +Inf is implicit).
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Observing is a bisect plus a few integer
+    updates; quantiles are estimated by interpolating inside the bucket, so they
+    are exact only to bucket resolution. Histograms with the same bounds merge.
+    """
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                # The +Inf bucket has no upper bound: the largest observation stands in.
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def merge(self, other):
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different buckets.")
+        for i, bucket_count in enumerate(other.counts):
+            self.counts[i] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+
+class _ToolStats:
+    __slots__ = ("calls", "errors", "latency", "queue_wait", "lock")
+
+    def __init__(self, bounds):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(bounds)
+        # Time spent waiting for admission (rate limit / concurrency slots), limited tools only.
+        self.queue_wait = Histogram(bounds)
+        self.lock = threading.Lock()
+
+
+def _summary(histogram):
+    return {
+        "p50": histogram.quantile(0.50),
+        "p95": histogram.quantile(0.95),
+        "p99": histogram.quantile(0.99),
+        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+        "max": histogram.max,
+    }
+
+
+def _histogram_state(histogram):
+    return {"counts": list(histogram.counts), "sum": histogram.sum, "max": histogram.max}
+
+
+class ToolMetrics:
+    """Per-tool call counts, error counts, latency and admission queue-wait histograms."""
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self._tools = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, tool_name):
+        stats = self._tools.get(tool_name)
+        if stats is None:
+            with self._lock:
+                stats = self._tools.setdefault(tool_name, _ToolStats(self.bounds))
+        return stats
+
+    def observe(self, tool_name, seconds, error=False):
+        stats = self._stats(tool_name)
+        with stats.lock:
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            stats.latency.observe(seconds)
+
+    def observe_queue_wait(self, tool_name, seconds):
+        stats = self._stats(tool_name)
+        with stats.lock:
+            stats.queue_wait.observe(seconds)
+
+    def snapshot(self):
+        """
+        {tool: {calls, errors, error_rate, latency_s: {p50, p95, p99, mean, max}}}, plus
+        queue_wait_s (same keys) for tools that went through admission.
+        """
+        with self._lock:
+            tools = dict(self._tools)
+        snapshot = {}
+        for name in sorted(tools):
+            stats = tools[name]
+            with stats.lock:
+                snapshot[name] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "error_rate": stats.errors / stats.calls if stats.calls else 0.0,
+                    "latency_s": _summary(stats.latency),
+                }
+                if stats.queue_wait.count:
+                    snapshot[name]["queue_wait_s"] = _summary(stats.queue_wait)
+        return snapshot
+
+    def export_state(self, reset=False):
+        """Raw counters as plain data (picklable/JSON), e.g. to ship from a worker process."""
+        with self._lock:
+            tools = dict(self._tools)
+            if reset:
+                self._tools = {}
+        state = {}
+        for name, stats in tools.items():
+            with stats.lock:
+                state[name] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    **_histogram_state(stats.latency),
+                    "queue_wait": _histogram_state(stats.queue_wait),
+                }
+        return state
+
+    def merge_state(self, state):
+        """Adds counters produced by export_state() (possibly in another process)."""
+        for name, data in state.items():
+            latency = self._histogram(name, data)
+            queue_wait = self._histogram(name, data["queue_wait"])
+            stats = self._stats(name)
+            with stats.lock:
+                stats.calls += data["calls"]
+                stats.errors += data["errors"]
+                stats.latency.merge(latency)
+                stats.queue_wait.merge(queue_wait)
+
+    def _histogram(self, name, data):
+        histogram = Histogram(self.bounds)
+        if len(data["counts"]) != len(histogram.counts):
+            raise ValueError(f"Cannot merge metrics for {name}: bucket layout differs.")
+        histogram.counts = list(data["counts"])
+        histogram.count = sum(histogram.counts)
+        histogram.sum = data["sum"]
+        histogram.max = data["max"]
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            self._tools = {}
+
+    def prometheus_text(self, prefix="axion_tool"):
+        """Renders the metrics in the Prometheus text exposition format."""
+        state = self.export_state()
+        names = sorted(state)
+        lines = [
+            f"# HELP {prefix}_calls_total Tool invocations.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        lines += [f'{prefix}_calls_total{{tool="{_label(n)}"}} {state[n]["calls"]}' for n in names]
+        lines += [
+            f"# HELP {prefix}_errors_total Tool invocations that returned or raised an error.",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        lines += [f'{prefix}_errors_total{{tool="{_label(n)}"}} {state[n]["errors"]}' for n in names]
+        lines += self._histogram_lines(
+            f"{prefix}_latency_seconds", "Tool invocation latency.",
+            [(n, state[n]) for n in names])
+        lines += self._histogram_lines(
+            f"{prefix}_queue_wait_seconds", "Time tool invocations waited for admission.",
+            [(n, state[n]["queue_wait"]) for n in names if any(state[n]["queue_wait"]["counts"])])
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, metric, help_text, histograms):
+        lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for name, data in histograms:
+            label = _label(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds + (None,), data["counts"]):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else repr(float(bound))
+                lines.append(f'{metric}_bucket{{tool="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{tool="{label}"}} {data["sum"]!r}')
+            lines.append(f'{metric}_count{{tool="{label}"}} {cumulative}')
+        return lines
+
+    def write_prometheus(self, path, prefix="axion_tool"):
+        """
+        Writes prometheus_text() atomically (temp file + os.replace), so a
+        node_exporter textfile collector never scrapes a half-written file.
+        """
+        text = self.prometheus_text(prefix)
+        directory = os.path.dirname(os.path.abspath(path))
+        # The collector usually runs as another user, so the file must not be left 0600.
+        fd, tmp_path = create_temp(directory, suffix=".prom.tmp", target=path)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Process-wide metrics shared by every ToolRegistry that is not given its own.
+_metrics = ToolMetrics()
+
+
+def get_metrics():
+    return _metrics
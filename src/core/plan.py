@@ -0,0 +1,169 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Mirrors the Node.action enum in schema/execution_graph.json.
+ACTIONS = ("run_tool", "write_file", "human_input", "logic_gate", "terminate")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+UNKNOWN_ACTION = len(ACTIONS)
+
+RUN_TOOL = ACTION_CODES["run_tool"]
+TERMINATE = ACTION_CODES["terminate"]
+
+# Transition sentinels. Real targets are indexes into CompiledPlan.nodes.
+NO_NODE = -1       # no transition, or the "END" pseudo-node
+MISSING_NODE = -2  # transition to a node ID that is not in the graph
+
+PLAN_CACHE_SIZE = 256
+
+
+def _canonical_json(obj):
+    # Raises TypeError for values JSON cannot represent, so they are never conflated with their str().
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(obj):
+    """Stable SHA-256 of a JSON-compatible object (key order independent)."""
+    return hashlib.sha256(_canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+class PlanNode:
+    """One row of the compiled node table. Transitions are integer indexes."""
+    __slots__ = (
+        "index", "node_id", "action", "action_code", "params",
+        "next", "on_success", "on_failure", "depends_on", "dependents",
+        "next_id", "on_success_id", "on_failure_id",
+    )
+
+    def __init__(self, index, node_id, node):
+        self.index = index
+        self.node_id = node_id
+        self.action = node.get("action")
+        self.action_code = ACTION_CODES.get(self.action, UNKNOWN_ACTION)
+        self.params = node.get("params", {})
+        # Raw target IDs are kept for error messages.
+        self.next_id = node.get("next")
+        self.on_success_id = node.get("on_success")
+        self.on_failure_id = node.get("on_failure")
+        self.next = NO_NODE
+        self.on_success = NO_NODE
+        self.on_failure = NO_NODE
+        self.depends_on = ()
+        self.dependents = ()
+
+    def success_target(self):
+        """
+        Where a successful run goes: `on_success` whenever it is set (so an explicit
+        "END" terminates), otherwise `next`. Returns (index, target_id).
+        """
+        if self.on_success_id:
+            return self.on_success, self.on_success_id
+        return self.next, self.next_id
+
+
+class CompiledPlan:
+    """A graph's nodes flattened into an indexed table with resolved transitions."""
+    __slots__ = ("digest", "entry_point", "entry", "nodes", "index", "dangling", "analysis")
+
+    def __init__(self, digest, entry_point, nodes, index, dangling):
+        self.digest = digest
+        self.entry_point = entry_point
+        self.entry = index.get(entry_point, MISSING_NODE) if entry_point else MISSING_NODE
+        self.nodes = nodes
+        self.index = index
+        # (node_id, field, target) for every transition that points nowhere.
+        self.dangling = dangling
+        # Filled in lazily by analysis.analyze_plan().
+        self.analysis = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def _build_plan(digest, entry_point, raw_nodes):
+    index = {node_id: i for i, node_id in enumerate(raw_nodes)}
+    index_get = index.get
+    nodes = []
+    dangling = []
+    dependents = [[] for _ in range(len(index))]
+
+    for i, (node_id, raw) in enumerate(raw_nodes.items()):
+        node = PlanNode(i, node_id, raw)
+        # Inlined per field: this loop dominates compile time on large graphs.
+        target = node.next_id
+        if target and target != "END":
+            node.next = index_get(target, MISSING_NODE)
+            if node.next == MISSING_NODE:
+                dangling.append((node_id, "next", target))
+        target = node.on_success_id
+        if target and target != "END":
+            node.on_success = index_get(target, MISSING_NODE)
+            if node.on_success == MISSING_NODE:
+                dangling.append((node_id, "on_success", target))
+        target = node.on_failure_id
+        if target and target != "END":
+            node.on_failure = index_get(target, MISSING_NODE)
+            if node.on_failure == MISSING_NODE:
+                dangling.append((node_id, "on_failure", target))
+
+        depends_on = raw.get("depends_on")
+        if depends_on:
+            resolved = []
+            for dep in depends_on:
+                dep_index = index_get(dep, MISSING_NODE)
+                if dep_index == MISSING_NODE:
+                    dangling.append((node_id, "depends_on", dep))
+                else:
+                    dependents[dep_index].append(i)
+                resolved.append(dep_index)
+            node.depends_on = tuple(resolved)
+        nodes.append(node)
+
+    for node, node_dependents in zip(nodes, dependents):
+        if node_dependents:
+            node.dependents = tuple(node_dependents)
+
+    return CompiledPlan(digest, entry_point, nodes, index, dangling)
+
+
+_plan_cache = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def compile_graph(graph):
+    """
+    Compiles a graph dict into a CompiledPlan.
+    Plans are cached by a content hash of `entry_point` and `nodes`, so resubmitting the
+    same workflow (even under a new graph_id) skips re-parsing.
+    """
+    entry_point = graph.get("entry_point")
+    raw_nodes = graph.get("nodes", {})
+    try:
+        payload = _canonical_json({"entry_point": entry_point, "nodes": raw_nodes})
+    except (TypeError, ValueError):
+        # Not JSON-serialisable (e.g. built in-process with live objects): compile uncached.
+        return _build_plan(None, entry_point, raw_nodes)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(digest)
+        if plan is not None:
+            _plan_cache.move_to_end(digest)
+            return plan
+
+    # Plans are shared between runs, so they must not alias the caller's dicts.
+    # Re-parsing the canonical payload is a cheaper private copy than deepcopy
+    # (node order becomes sorted by ID, which keeps plans deterministic).
+    plan = _build_plan(digest, entry_point, json.loads(payload)["nodes"])
+
+    with _plan_cache_lock:
+        _plan_cache[digest] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_plan_cache():
+    with _plan_cache_lock:
+        _plan_cache.clear()
@@ -0,0 +1,141 @@
+import hashlib
+import math
+import re
+
+# ATX headings ("## Title"); setext headings are rare in the persona files and not indexed.
+_HEADING = re.compile(r"^(#{1,6})[ \t]+(.*?)[ \t#]*$", re.MULTILINE)
+_FENCE = re.compile(r"^[ \t]*(```|~~~)", re.MULTILINE)
+
+
+def estimate_tokens(text):
+    """
+    Offline token estimate: ~4 ASCII characters per token, and one token per
+    non-ASCII character (emoji and accented text tokenize poorly). Runs at C
+    speed and errs on the high side for English prose.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def section_digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class Section:
+    """
+    A heading and the text up to the next heading. `parent` is the enclosing
+    section's index; `path` is the "/"-joined heading titles from the top level
+    down (stable across edits elsewhere in the file); `digest` hashes the text.
+    """
+    __slots__ = ("index", "title", "level", "start", "end", "text", "tokens", "parent", "path", "digest")
+
+    def __init__(self, index, title, level, start, end, text, parent, path=None):
+        self.index = index
+        self.title = title
+        self.level = level
+        self.start = start
+        self.end = end
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.parent = parent
+        self.path = title if path is None else path
+        self.digest = section_digest(text)
+
+
+def _fenced_ranges(text):
+    ranges = []
+    opened = None
+    for match in _FENCE.finditer(text):
+        if opened is None:
+            opened = match
+        elif match.group(1) == opened.group(1):
+            ranges.append((opened.start(), match.end()))
+            opened = None
+    if opened is not None:
+        ranges.append((opened.start(), len(text)))
+    return ranges
+
+
+def split_sections(text):
+    """
+    Splits markdown into contiguous sections at headings (ignoring "#" lines inside
+    code fences). Text before the first heading is a level-0 section titled "".
+    Concatenating every section's text reproduces the input exactly.
+    """
+    fenced = _fenced_ranges(text)
+    starts = [
+        (m.start(), len(m.group(1)), m.group(2))
+        for m in _HEADING.finditer(text)
+        if not any(lo <= m.start() < hi for lo, hi in fenced)
+    ]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, 0, ""))
+
+    sections = []
+    open_sections = []  # stack of (level, index)
+    seen_paths = {}
+    for i, (start, level, title) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(text)
+        while open_sections and open_sections[-1][0] >= level:
+            open_sections.pop()
+        parent = open_sections[-1][1] if open_sections else None
+        path = f"{sections[parent].path}/{title}" if parent is not None else title
+        # Repeated headings under the same parent get "~2", "~3", ...
+        seen_paths[path] = seen_paths.get(path, 0) + 1
+        if seen_paths[path] > 1:
+            path = f"{path}~{seen_paths[path]}"
+        sections.append(Section(i, title, level, start, end, text[start:end], parent, path))
+        if level:
+            open_sections.append((level, i))
+    return sections
+
+
+def select_sections(candidates, budget):
+    """
+    Greedily keeps sections in priority order (lower number first, then document
+    order) while they fit in `budget` tokens. A section is never kept without its
+    parent, so a child's effective priority is never better than its parent's.
+
+    `candidates` is a list of (key, section, priority, parent_key) in document order.
+    Returns (kept keys, dropped keys).
+    """
+    effective = {}
+    for key, _, priority, parent_key in candidates:
+        effective[key] = max(priority, effective[parent_key]) if parent_key is not None else priority
+
+    ordered = sorted(range(len(candidates)), key=lambda i: (effective[candidates[i][0]], i))
+    kept = set()
+    dropped = set()
+    used = 0
+    for i in ordered:
+        key, section, _, parent_key = candidates[i]
+        if parent_key is not None and parent_key not in kept:
+            dropped.add(key)
+            continue
+        if used + section.tokens > budget:
+            dropped.add(key)
+            continue
+        kept.add(key)
+        used += section.tokens
+    return kept, dropped
+
+
+def diff_sections(previous_hashes, sections):
+    """
+    Compares a previously sent {section_id: digest} manifest with the current
+    (section_id, Section) pairs, in prompt order.
+    Returns (added, changed, removed): the first two as {"id", "text"} lists.
+    """
+    added, changed = [], []
+    current = set()
+    for section_id, section in sections:
+        current.add(section_id)
+        previous = previous_hashes.get(section_id)
+        if previous is None:
+            added.append({"id": section_id, "text": section.text})
+        elif previous != section.digest:
+            changed.append({"id": section_id, "text": section.text})
+    removed = [section_id for section_id in previous_hashes if section_id not in current]
+    return added, changed, removed
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("Axion.ResultCache")
+
+
+def make_key(tool_name, kwargs):
+    """
+    Canonical cache key for a tool call: tool name plus sorted, JSON-encoded kwargs.
+    Returns None when the arguments are not JSON-serialisable (such calls are never cached).
+    """
+    try:
+        payload = json.dumps([tool_name, kwargs], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU with optional TTL for tool results, plus an optional on-disk tier.
+
+    Values are stored as JSON text, so every hit returns a fresh copy. Only results
+    that survive a JSON round trip unchanged are cached (a tuple would come back as
+    a list), so a hit always returns what the original call did. The disk tier keeps
+    one file per key under `disk_dir`, survives process restarts and is bounded to
+    `max_disk_entries` files: writes past the bound evict expired, then least
+    recently used, entries.
+    """
+    def __init__(self, max_entries=1024, ttl=None, disk_dir=None, max_disk_entries=4096):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_count = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_count = len(self._disk_files())
+
+    def get(self, key):
+        """Returns (hit, value)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, json.loads(payload)
+                del self._entries[key]
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store_memory(key, payload, now)
+        return True, json.loads(payload)
+
+    def put(self, key, value):
+        """Caches a value. Returns False if it is not JSON-serialisable or would not round-trip unchanged."""
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return False
+        if json.loads(payload) != value:
+            return False
+
+        with self._lock:
+            self._store_memory(key, payload, time.monotonic())
+        self._write_disk(key, payload)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+        if self.disk_dir:
+            for path in self._disk_files():
+                os.remove(path)
+            with self._lock:
+                self._disk_count = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "size": len(self._entries),
+            }
+
+    def _store_memory(self, key, payload, now):
+        expires_at = now + self.ttl if self.ttl else None
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        return [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith(".json")]
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            return None
+
+        # Disk entries outlive the process, so they expire on wall-clock time.
+        expires_at = record.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)  # the file's mtime is its LRU position on disk
+        except OSError:
+            pass
+        return record["payload"]
+
+    def _write_disk(self, key, payload):
+        if not self.disk_dir:
+            return
+        record = {
+            "expires_at": time.time() + self.ttl if self.ttl else None,
+            "payload": payload,
+        }
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            logger.warning(f"Could not persist cache entry {key}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        # Overwrites are counted too; the count is corrected whenever a prune rescans.
+        with self._lock:
+            self._disk_count += 1
+            over = self._disk_count > self.max_disk_entries
+        if over:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """
+        Evicts expired files, then the least recently used, down to 90% of
+        max_disk_entries so the directory scan is amortised over many writes.
+        """
+        entries = []
+        for path in self._disk_files():
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+
+        target = int(self.max_disk_entries * 0.9)
+        expired_before = time.time() - self.ttl if self.ttl else None
+        keep = len(entries)
+        for mtime, path in entries:
+            if keep <= target and (expired_before is None or mtime > expired_before):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            keep -= 1
+        with self._lock:
+            self._disk_count = keep
@@ -0,0 +1,260 @@
+import contextlib
+import mmap
+import os
+import stat
+import threading
+from array import array
+from collections import OrderedDict
+
+# Files at least this large are read through mmap instead of seek/read.
+MMAP_THRESHOLD = 1024 * 1024
+LINE_INDEX_CACHE_SIZE = 32
+# Total bytes of file content kept by the shared read cache.
+CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+_SCAN_CHUNK = 4 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """
+    Yields a read-only memoryview over the whole file, backed by mmap (zero-copy).
+    Slices must not outlive the `with` block.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def create_temp(directory, prefix=".axion-", suffix=".tmp", target=None):
+    """
+    tempfile.mkstemp() for files that will be renamed over `target`: opened
+    (fd, path) with mode 0666 so the kernel applies the umask, as a plain open()
+    would (mkstemp always uses 0600). If `target` exists its mode is kept instead.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_CLOEXEC", 0)
+    for _ in range(100):
+        path = os.path.join(directory, f"{prefix}{os.urandom(8).hex()}{suffix}")
+        try:
+            fd = os.open(path, flags, 0o666)
+        except FileExistsError:
+            continue
+        break
+    else:
+        raise FileExistsError(f"No usable temporary file name in {directory}")
+
+    if target is not None:
+        try:
+            os.fchmod(fd, stat.S_IMODE(os.stat(target).st_mode))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            os.close(fd)
+            os.remove(path)
+            raise
+    return fd, path
+
+
+def read_range(path, offset, length):
+    """Reads `length` bytes from `offset` (length None = to EOF). Large files go through mmap."""
+    size = os.path.getsize(path)
+    offset = max(0, min(offset, size))
+    end = size if length is None else min(size, offset + max(0, length))
+    if size >= MMAP_THRESHOLD:
+        with map_file(path) as view:
+            return bytes(view[offset:end])
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(end - offset)
+
+
+# Bytes past a page's end that may be needed to finish a split UTF-8 character.
+PAGE_SLACK = 3
+
+
+def _is_continuation(byte):
+    return byte & 0xC0 == 0x80
+
+
+def char_boundary(data, index, forward=False):
+    """
+    `index` moved to the nearest UTF-8 character start (back, or forward with `forward`),
+    at most PAGE_SLACK bytes away. Unchanged when it is already on a boundary or the bytes
+    are not UTF-8.
+    """
+    if index <= 0 or index >= len(data):
+        return index
+    step = 1 if forward else -1
+    boundary = index
+    while abs(boundary - index) < PAGE_SLACK and 0 < boundary < len(data) and _is_continuation(data[boundary]):
+        boundary += step
+    return index if 0 < boundary < len(data) and _is_continuation(data[boundary]) else boundary
+
+
+def decode_page(data, offset, length):
+    """
+    Turns bytes read at `offset` into a text page that matches what a full read
+    returns. `data` must hold up to `length` + PAGE_SLACK bytes (to EOF when `length`
+    is None).
+
+    The page never starts or ends inside a UTF-8 character, and never splits
+    "\r\n". Newlines are translated the way text-mode open() does.
+    Returns (text, start, next_offset): the byte offsets the page covers.
+    """
+    start = 0
+    if offset > 0:
+        while start < min(PAGE_SLACK, len(data)) and _is_continuation(data[start]):
+            start += 1
+
+    end = len(data)
+    if length is not None and length < len(data):
+        end = max(length, start)
+        while end > start and length - end < PAGE_SLACK and _is_continuation(data[end]):
+            end -= 1
+        if end == start and length > start:
+            # A single character straddles the whole page: include it rather than return nothing.
+            end = length
+            while end < len(data) and _is_continuation(data[end]):
+                end += 1
+        if end - 1 > start and data[end - 1:end + 1] == b"\r\n":
+            end -= 1
+
+    text = data[start:end].decode('utf-8', errors='replace')
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text, offset + start, offset + end
+
+
+def iter_chunks(path, chunk_size=1024 * 1024, offset=0):
+    """Yields the file as successive byte chunks, starting at `offset`."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class LineIndex:
+    """Byte offset of the start of every line in a file."""
+    __slots__ = ("mtime_ns", "size", "offsets")
+
+    def __init__(self, mtime_ns, size, offsets):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.offsets = offsets
+
+    @property
+    def line_count(self):
+        return len(self.offsets)
+
+    def span(self, start_line, end_line):
+        """Byte (offset, length) covering 1-based, inclusive lines start_line..end_line."""
+        start_line = max(1, start_line)
+        end_line = min(self.line_count, end_line)
+        if start_line > end_line:
+            return self.size, 0
+        start = self.offsets[start_line - 1]
+        end = self.offsets[end_line] if end_line < self.line_count else self.size
+        return start, end - start
+
+
+def _build_line_index(path, st):
+    offsets = array('q', [0]) if st.st_size else array('q')
+    base = 0
+    for chunk in iter_chunks(path, _SCAN_CHUNK):
+        position = chunk.find(b"\n")
+        while position != -1:
+            offsets.append(base + position + 1)
+            position = chunk.find(b"\n", position + 1)
+        base += len(chunk)
+    # A trailing newline does not start another line.
+    if offsets and offsets[-1] == st.st_size:
+        offsets.pop()
+    return LineIndex(st.st_mtime_ns, st.st_size, offsets)
+
+
+_line_indexes = OrderedDict()
+_line_indexes_lock = threading.Lock()
+
+
+def line_index(path):
+    """Returns the (cached) LineIndex for a file, rebuilding it when mtime or size changed."""
+    st = os.stat(path)
+    with _line_indexes_lock:
+        cached = _line_indexes.get(path)
+        if cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+            _line_indexes.move_to_end(path)
+            return cached
+
+    index = _build_line_index(path, st)
+    with _line_indexes_lock:
+        _line_indexes[path] = index
+        _line_indexes.move_to_end(path)
+        while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+            _line_indexes.popitem(last=False)
+    return index
+
+
+class ContentCache:
+    """
+    Size-bounded LRU of decoded file contents, keyed by absolute path and validated
+    against (st_mtime_ns, st_size) so edits made outside the process are noticed.
+    """
+    def __init__(self, max_bytes=CONTENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, st):
+        """Cached content for `path` if it still matches the stat result `st`, else None."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, path, st, content):
+        if st.st_size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(path)
+            self._entries[path] = (st.st_mtime_ns, st.st_size, content)
+            self._bytes += st.st_size
+            while self._bytes > self.max_bytes:
+                _, (_, size, _) = self._entries.popitem(last=False)
+                self._bytes -= size
+
+    def invalidate(self, path):
+        with self._lock:
+            self._discard(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+# Shared by read_file/write_file across every node and run in the process.
+content_cache = ContentCache()
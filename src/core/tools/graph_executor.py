@@ -1,122 +1,46 @@
-import time
-import json
-
-class GraphExecutor:
-    def __init__(self):
-        pass
-
-    def execute(self, graph_data):
-        """
-        Traverses the graph and simulates execution.
-        Adheres to src/core/schema/execution_graph.json.
-        """
-        graph_id = graph_data.get('graph_id', 'unknown')
-        entry_point = graph_data.get('entry_point')
-        nodes = graph_data.get('nodes', {})
-
-        print(f"[EXECUTOR] Starting Graph execution: {graph_id}")
-
-        current_node_id = entry_point
-        visited = set()
-
-        # Safety limit for iterations to prevent infinite loops even if visited set logic fails for some DAG structures
-        iterations = 0
-        max_iterations = 100
-
-        while current_node_id:
-            iterations += 1
-            if iterations > max_iterations:
-                print("[EXECUTOR] Max iterations reached. Aborting.")
-                break
-
-            # In a DAG, we can visit a node multiple times if paths converge, but we shouldn't have cycles.
-            # However, for simplicity here, we track path to avoid cycles?
-            # The prompt says DAG.
-
-            node = nodes.get(current_node_id)
-            if not node:
-                print(f"[EXECUTOR] Error: Node '{current_node_id}' not found.")
-                break
-
-            action = node.get('action')
-            params = node.get('params', {})
-
-            print(f"[EXECUTOR] >> Node {current_node_id} [{action}]")
-
-            if action == 'terminate':
-                print(f"    [TERM] Terminating sequence.")
-                break
-
-            # Execute Action
-            success = self._perform_action(action, params)
-
-            # Determine Transition
-            # Priority: 'next' (Unconditional) > 'on_success'/'on_failure'
-
-            next_node = node.get('next')
-
-            if not next_node:
-                if success:
-                    next_node = node.get('on_success')
-                else:
-                    next_node = node.get('on_failure')
-
-            if next_node:
-                current_node_id = next_node
-            else:
-                # Terminal state
-                print(f"[EXECUTOR] Node {current_node_id} finished with no transition. Execution End.")
-                break
-
-    def _perform_action(self, action, params):
-        """
-        Simulates the action execution.
-        In a real system, this would call ToolRegistry.
-        """
-        # Mock implementations
-        if action == 'run_tool':
-            tool_name = params.get('tool')
-            args = params.get('args')
-            print(f"    [TOOL] Running {tool_name} with {args}")
-            # Simulate tool output
-            return True
-
-        elif action == 'write_file':
-            filepath = params.get('filepath')
-            print(f"    [FILE] Writing to {filepath}")
-            return True
-
-        elif action == 'human_input':
-            print(f"    [INPUT] Waiting for user input... (Simulated: 'Proceed')")
-            return True
-
-        elif action == 'logic_gate':
-            condition = params.get('condition')
-            print(f"    [LOGIC] Evaluating {condition} -> True")
-            return True
-
-        else:
-            print(f"    [UNKNOWN] Action {action} not recognized.")
-            return False
-import json
 import logging
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 # Note: Ensure core.bus is implemented as requested previously
-from core.bus import NexusBus
-from core.tools.registry import ToolRegistry
+from ..analysis import GraphAnalysisError, analyze_plan
+from .. import tracing
+from ..bus import NexusBus
+from ..journal import ExecutionJournal
+from ..plan import ACTIONS, RUN_TOOL, NO_NODE, MISSING_NODE, compile_graph
+from .overlay import WorkspaceOverlay
+from .registry import ToolRegistry
 
 class SecurityError(Exception):
     pass
 
+class RunResult(dict):
+    """
+    {node_id: result} for one run, plus how the run ended: `status` is
+    completed, failed (the last node did not succeed), aborted or crashed.
+    """
+    def __init__(self, results, status):
+        super().__init__(results)
+        self.status = status
+
 class GraphExecutor:
     """
     Traverses the Sovereign Execution Graph.
     Acts as the 'Soldier' validating the 'General's' orders.
     """
-    def __init__(self, event_bus: NexusBus):
+    def __init__(self, event_bus: NexusBus, registry: ToolRegistry = None):
         self.bus = event_bus
-        self.registry = ToolRegistry()
+        # Built-in tools are registered lazily; their modules load on first use.
+        self.registry = registry if registry is not None else ToolRegistry.with_default_tools()
         self.logger = logging.getLogger("Axion.Executor")
 
+        # Action handlers indexed by PlanNode.action_code (last slot: unknown actions).
+        self._handlers = [self._mock_action] * (len(ACTIONS) + 1)
+        self._handlers[RUN_TOOL] = self._run_tool
+        self._async_handlers = [self._mock_action_async] * (len(ACTIONS) + 1)
+        self._async_handlers[RUN_TOOL] = self._run_tool_async
+
     def validate_integrity(self, graph: dict):
         """
         Zero-Trust Check: Does the intent_glyph match the graph actions?
@@ -128,51 +52,279 @@ class GraphExecutor:
         if "🛡️" in glyph and "security_scan" not in str(graph):
             raise SecurityError("Graph deviates from Sentinel Intent! Halting.")
 
-    def execute(self, graph: dict):
+    def execute(self, graph: dict, journal_path: str = None, transactional: bool = False):
+        """
+        Walks the graph one node at a time. Returns a RunResult ({node_id: result} + status).
+        With `journal_path`, every completed node is checkpointed so a crashed run can resume().
+        With `transactional`, file writes are staged in a WorkspaceOverlay and only committed
+        if the run ends on a successful node; otherwise they are discarded.
+        """
+        if journal_path is not None and transactional:
+            # Checkpointed nodes would be skipped on resume while their staged writes were lost.
+            raise ValueError("A run cannot be both journaled and transactional.")
+
+        self.validate_integrity(graph)
+        context = graph.get("context_delta", {})
+        plan = self._checked_plan(graph, context)
+
+        if transactional:
+            overlay = WorkspaceOverlay()
+            with overlay.activate():
+                results, status = self._run_sequential(plan, context, plan.entry, {}, None)
+            if status == "completed":
+                overlay.commit()
+            else:
+                self.logger.warning(f"Graph {status}: discarding staged writes {overlay.pending()}")
+                overlay.discard()
+            return RunResult(results, status)
+
+        if journal_path is None:
+            return RunResult(*self._run_sequential(plan, context, plan.entry, {}, None))
+
+        with ExecutionJournal(journal_path) as journal:
+            journal.begin(plan.digest, graph.get("graph_id"), context)
+            return RunResult(*self._run_sequential(plan, context, plan.entry, {}, journal))
+
+    def resume(self, graph: dict, journal_path: str):
+        """
+        Continues a journaled run from the last committed node instead of the entry point.
+        Completed nodes are not re-run; their results and context come from the journal.
+        """
+        if not os.path.exists(journal_path):
+            raise FileNotFoundError(
+                f"Cannot resume: journal {journal_path} does not exist. "
+                f"Start the run with execute(graph, journal_path=...) first.")
+        state = ExecutionJournal.load(journal_path)
+        if state.digest is None:
+            return self.execute(graph, journal_path)
+
         self.validate_integrity(graph)
         context = graph.get("context_delta", {})
-        current_node_id = graph["entry_point"]
+        context.update(state.context or {})
+        plan = self._checked_plan(graph, context)
+        if plan.digest != state.digest:
+            raise ValueError(f"Journal {journal_path} was written for a different graph.")
+
+        results = dict(state.results)
+        if state.finished:
+            return RunResult(results, state.status)
+
+        if state.results:
+            current = plan.index.get(state.next_node_id, NO_NODE) if state.next_node_id else NO_NODE
+            self.logger.info(f"Resuming graph at: {state.next_node_id} ({len(results)} nodes already done)")
+        else:
+            current = plan.entry
 
-        while current_node_id and current_node_id != "END":
-            node = graph["nodes"].get(current_node_id)
-            if not node:
-                self.logger.error(f"Node {current_node_id} not found.")
-                break
+        with ExecutionJournal(journal_path) as journal:
+            return RunResult(*self._run_sequential(plan, context, current, results, journal))
 
-            self.logger.info(f"Executing Node: {current_node_id} [{node['action']}]")
+    def _run_sequential(self, plan, context, current, results, journal):
+        with tracing.span("graph", "graph", digest=plan.digest, mode="sequential"):
+            return self._walk(plan, context, current, results, journal)
+
+    def _walk(self, plan, context, current, results, journal):
+        """Returns (results, status); status is completed, failed, aborted or crashed."""
+        nodes = plan.nodes
+        status = "completed"
+        result = None
+
+        while current >= 0:
+            node = nodes[current]
+            self.logger.info(f"Executing Node: {node.node_id} [{node.action}]")
 
             # Execute Action via Registry
             try:
-                result = self._dispatch_action(node, context)
-
-                # Determine transition
-                if result.get('status') == 'success':
-                    current_node_id = node.get("on_success") or node.get("next")
-                else:
-                    current_node_id = node.get("on_failure")
-
-                    # Recursive Logic (Source [2])
-                    if context.get("retry_on_fail") and context.get("retry_count", 0) < 3:
-                        self.logger.warning("Triggering Self-Correction Loop...")
-                        context["retry_count"] = context.get("retry_count", 0) + 1
-                        # In a real graph, this would loop back to a repair node defined in on_failure
-                    elif context.get("retry_on_fail"):
-                         self.logger.error("Max retries exceeded. Aborting.")
-                         break
+                result = self._run_node(node, context)
+                results[node.node_id] = result
+
+                current, abort = self._next_node(node, result, context)
+                if journal is not None:
+                    next_node_id = nodes[current].node_id if current >= 0 else None
+                    journal.record_node(node.node_id, result, next_node_id, context)
+                if abort:
+                    status = "aborted"
+                    break
 
             except Exception as e:
+                # No checkpoint for the crashed node: a resume retries it.
                 self.logger.critical(f"Graph Crash: {e}")
-                break
+                return results, "crashed"
 
-    def _dispatch_action(self, node, context):
-        # Maps graph actions to specific tool calls
-        if node['action'] == 'run_tool':
-            tool_name = node['params']['tool']
-            args = node['params'].get('args', {})
-            # Inject context if needed (Source [1])
-            if context.get("shizuku_active"):
-                args["use_root"] = True
+        if status == "completed" and result is not None and result.get('status') != 'success':
+            status = "failed"
+        if journal is not None:
+            journal.finish(status)
+        return results, status
 
-            return self.registry.invoke(tool_name, **args)
+    async def execute_async(self, graph: dict):
+        """
+        Awaitable variant of execute() for driving many graphs from one event loop.
+        Tool calls go through ToolRegistry.ainvoke. Returns a RunResult.
+        """
+        self.validate_integrity(graph)
+        context = graph.get("context_delta", {})
+        plan = self._checked_plan(graph, context)
+        with tracing.span("graph", "graph", digest=plan.digest, mode="async"):
+            return RunResult(*await self._walk_async(plan, context))
+
+    async def _walk_async(self, plan, context):
+        nodes = plan.nodes
+        handlers = self._async_handlers
+        results = {}
+        status = "completed"
+        result = None
+
+        current = plan.entry
+        while current >= 0:
+            node = nodes[current]
+            self.logger.info(f"Executing Node: {node.node_id} [{node.action}]")
 
+            try:
+                with tracing.span(node.node_id, "node", action=node.action):
+                    result = await handlers[node.action_code](node, context)
+                results[node.node_id] = result
+
+                current, abort = self._next_node(node, result, context)
+                if abort:
+                    status = "aborted"
+                    break
+
+            except Exception as e:
+                self.logger.critical(f"Graph Crash: {e}")
+                return results, "crashed"
+
+        if status == "completed" and result is not None and result.get('status') != 'success':
+            status = "failed"
+        return results, status
+
+    def execute_parallel(self, graph: dict, max_workers: int = 4):
+        """
+        Runs independent branches of the graph concurrently on a bounded thread pool.
+
+        A node is ready once it has been reached (entry point, or the transition
+        target of a finished node) and every node in its `depends_on` list has
+        succeeded. Nodes with `depends_on` are reached implicitly when their
+        dependencies finish, which is how fan-out and fan-in are expressed.
+        Each node runs at most once. Returns a RunResult; it is failed if any branch ended on a failed node.
+        """
+        self.validate_integrity(graph)
+        context = graph.get("context_delta", {})
+        plan = self._checked_plan(graph, context)
+        nodes = plan.nodes
+
+        results = {}
+        started = [False] * len(nodes)
+        succeeded = [False] * len(nodes)
+        pending = {}
+        # Retry bookkeeping mutates the shared context from the scheduler thread only,
+        # but tools may read it concurrently.
+        context_lock = threading.Lock()
+        aborted = False
+        failed = False
+
+        graph_span = tracing.span("graph", "graph", digest=plan.digest, mode="parallel")
+        with graph_span, ThreadPoolExecutor(max_workers=max_workers) as pool:
+            def schedule(index):
+                if index < 0 or started[index]:
+                    return
+                node = nodes[index]
+                # A dangling dependency (MISSING_NODE) can never be satisfied.
+                if any(dep < 0 or not succeeded[dep] for dep in node.depends_on):
+                    return
+
+                started[index] = True
+                self.logger.info(f"Executing Node: {node.node_id} [{node.action}]")
+                # Each task gets its own copy of the caller's contextvars (e.g. an active overlay).
+                pending[pool.submit(contextvars.copy_context().run, self._run_node, node, context)] = node
+
+            schedule(plan.entry)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.critical(f"Node Crash: {node.node_id}: {e}")
+                        result = {"status": "error", "message": str(e)}
+                    results[node.node_id] = result
+
+                    if aborted:
+                        continue
+
+                    with context_lock:
+                        next_index, abort = self._next_node(node, result, context)
+                    if abort:
+                        # Let in-flight branches drain, but start nothing new.
+                        aborted = True
+                        continue
+
+                    if result.get('status') == 'success':
+                        succeeded[node.index] = True
+                        for dependent in node.dependents:
+                            schedule(dependent)
+                    elif next_index < 0:
+                        failed = True
+                    schedule(next_index)
+
+        status = "aborted" if aborted else "failed" if failed else "completed"
+        return RunResult(results, status)
+
+    def _checked_plan(self, graph, context):
+        """
+        Compiles the graph and runs the static analysis pass before anything executes.
+        Replaces an iteration cap: a graph that passes cannot loop forever.
+        """
+        plan = compile_graph(graph)
+        analysis = analyze_plan(plan)
+        for warning in analysis.warnings():
+            self.logger.warning(f"Graph analysis: {warning}")
+
+        errors = analysis.errors(retry_on_fail=bool(context.get("retry_on_fail")))
+        if errors:
+            raise GraphAnalysisError("; ".join(errors))
+        return plan
+
+    def _run_node(self, node, context):
+        with tracing.span(node.node_id, "node", action=node.action):
+            return self._handlers[node.action_code](node, context)
+
+    def _next_node(self, node, result, context):
+        """Resolves the transition after a node ran. Returns (next_node_index, abort)."""
+        if result.get('status') == 'success':
+            target, target_id = node.success_target()
+        else:
+            # Recursive Logic (Source [2])
+            if context.get("retry_on_fail") and context.get("retry_count", 0) < 3:
+                self.logger.warning("Triggering Self-Correction Loop...")
+                context["retry_count"] = context.get("retry_count", 0) + 1
+                # In a real graph, this would loop back to a repair node defined in on_failure
+            elif context.get("retry_on_fail"):
+                self.logger.error("Max retries exceeded. Aborting.")
+                return NO_NODE, True
+            target, target_id = node.on_failure, node.on_failure_id
+
+        if target == MISSING_NODE:
+            self.logger.error(f"Node {target_id} not found.")
+        return target, False
+
+    def _tool_args(self, node, context):
+        # Plans are cached and shared between runs, so never mutate node.params in place.
+        args = dict(node.params.get('args', {}))
+        # Inject context if needed (Source [1])
+        if context.get("shizuku_active"):
+            args["use_root"] = True
+        return args
+
+    def _run_tool(self, node, context):
+        return self.registry.invoke(node.params['tool'], **self._tool_args(node, context))
+
+    def _mock_action(self, node, context):
         return {"status": "success"} # Mock return for non-tool actions
+
+    async def _run_tool_async(self, node, context):
+        return await self.registry.ainvoke(node.params['tool'], **self._tool_args(node, context))
+
+    async def _mock_action_async(self, node, context):
+        return {"status": "success"}
@@ -0,0 +1,195 @@
+import asyncio
+import collections
+import threading
+import time
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` calls per second, bursts of up to `burst`."""
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        # A bucket that can never hold a whole token would block every caller forever.
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1.")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self):
+        """Takes a token if one is available. Returns 0.0 on success, else seconds until one will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def take(self):
+        while True:
+            delay = self.try_take()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def take_async(self):
+        while True:
+            delay = self.try_take()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Slots:
+    """
+    Counting semaphore that threads and coroutines (on any event loop) wait on together.
+    Waiters are served in arrival order: release() hands the slot straight to the oldest
+    one, waking a thread through an Event and a coroutine through its loop, so neither
+    side polls.
+    """
+    def __init__(self, value):
+        if value < 1:
+            raise ValueError("value must be at least 1.")
+        self.value = value
+        self._free = value
+        # threading.Event for blocked threads, (loop, future) for awaiting coroutines.
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except BaseException:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued:
+                # Cancelled after release() handed us the slot: pass it on.
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(_wake, future)
+                    return
+                except RuntimeError:
+                    continue  # Its loop is closed; nobody is left to take the slot.
+            if self._free >= self.value:
+                raise ValueError("Slots released too many times.")
+            self._free += 1
+
+
+class QueueStats:
+    """How long calls waited for admission."""
+    __slots__ = ("calls", "waited", "total_wait_s", "max_wait_s", "_lock")
+
+    def __init__(self):
+        self.calls = 0
+        self.waited = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait_s):
+        with self._lock:
+            self.calls += 1
+            if wait_s > 0:
+                self.waited += 1
+                self.total_wait_s += wait_s
+                self.max_wait_s = max(self.max_wait_s, wait_s)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "waited": self.waited,
+                "total_wait_s": self.total_wait_s,
+                "max_wait_s": self.max_wait_s,
+                "avg_wait_s": self.total_wait_s / self.calls if self.calls else 0.0,
+            }
+
+
+class Admission:
+    """
+    Bulkhead + rate limit for one tool, plus an optional shared global budget.
+    Slots are always taken in the same order (rate token, tool slot, global slot) so
+    concurrent callers cannot deadlock.
+    """
+    def __init__(self, max_concurrency=None, rate=None, burst=None, global_slots=None):
+        self.slots = Slots(max_concurrency) if max_concurrency else None
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.global_slots = global_slots
+        self.stats = QueueStats()
+
+    def acquire(self):
+        """Blocks until the call is admitted. Returns the seconds spent waiting."""
+        start = time.perf_counter()
+        if self.bucket is not None:
+            self.bucket.take()
+        if self.slots is not None:
+            self.slots.acquire()
+        if self.global_slots is not None:
+            self.global_slots.acquire()
+        wait = time.perf_counter() - start
+        self.stats.record(wait)
+        return wait
+
+    async def acquire_async(self):
+        """Awaitable acquire(): sleeps until the next token and awaits slots without blocking the loop."""
+        start = time.perf_counter()
+        if self.bucket is not None:
+            await self.bucket.take_async()
+        held = []
+        try:
+            for slots in (self.slots, self.global_slots):
+                if slots is None:
+                    continue
+                await slots.acquire_async()
+                held.append(slots)
+        except BaseException:
+            # Cancelled while queued: give back whatever was already taken.
+            for slots in held:
+                slots.release()
+            raise
+        wait = time.perf_counter() - start
+        self.stats.record(wait)
+        return wait
+
+    def release(self):
+        if self.global_slots is not None:
+            self.global_slots.release()
+        if self.slots is not None:
+            self.slots.release()
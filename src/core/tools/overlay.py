@@ -0,0 +1,109 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+
+from . import fileio
+
+logger = logging.getLogger("Axion.Overlay")
+
+_active_overlay = contextvars.ContextVar("axion_active_overlay", default=None)
+
+
+class WorkspaceOverlay:
+    """
+    In-memory copy-on-write layer for file writes.
+
+    While active, write_file stages content here and read_file serves staged
+    content first (read-your-writes). commit() publishes every staged file via
+    temp file + os.replace; discard() drops them without touching disk.
+    """
+    def __init__(self):
+        self._writes = {}
+        self._lock = threading.Lock()
+
+    def write(self, path, content):
+        with self._lock:
+            self._writes[path] = content
+
+    def read(self, path):
+        """Staged content for an absolute path, or None."""
+        with self._lock:
+            return self._writes.get(path)
+
+    def __contains__(self, path):
+        with self._lock:
+            return path in self._writes
+
+    def pending(self):
+        with self._lock:
+            return sorted(self._writes)
+
+    def commit(self):
+        """
+        Publishes staged writes in two phases: every file is first written and fsynced
+        to a temp file beside its target, then all are renamed into place. A failure
+        in the first phase leaves the workspace untouched.
+        """
+        with self._lock:
+            writes = dict(self._writes)
+
+        staged = []
+        try:
+            for path, content in writes.items():
+                directory = os.path.dirname(path)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = fileio.create_temp(directory, target=path)
+                staged.append((tmp_path, path))
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception:
+            for tmp_path, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+            fileio.content_cache.invalidate(path)
+
+        with self._lock:
+            self._writes.clear()
+        logger.info(f"Committed {len(staged)} staged file(s).")
+        return [path for _, path in staged]
+
+    def discard(self):
+        with self._lock:
+            count = len(self._writes)
+            self._writes.clear()
+        if count:
+            logger.info(f"Discarded {count} staged file(s).")
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Routes read_file/write_file in the current context through this overlay."""
+        token = _active_overlay.set(self)
+        try:
+            yield self
+        finally:
+            _active_overlay.reset(token)
+
+
+def active_overlay():
+    return _active_overlay.get()
+
+
+@contextlib.contextmanager
+def transaction():
+    """Stages writes made inside the block; commits on success, discards if it raises."""
+    overlay = WorkspaceOverlay()
+    with overlay.activate():
+        try:
+            yield overlay
+        except BaseException:
+            overlay.discard()
+            raise
+    overlay.commit()
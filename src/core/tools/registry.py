@@ -1,29 +1,264 @@
+import asyncio
+import contextvars
+import functools
+import importlib
+import importlib.metadata
+import inspect
+import json
 import logging
+import os
+import threading
+import time
+
+from .. import metrics as tool_metrics
+from .. import tracing
+from .cache import ResultCache, make_key
+from .limits import Admission, Slots
+from .workers import ProcessToolPool, function_target
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manifest.json')
+ENTRY_POINT_GROUP = "axion.tools"
 
 class ToolRegistry:
-    def __init__(self):
+    def __init__(self, cache: ResultCache = None, max_concurrency: int = None, process_workers: int = None,
+                 metrics: tool_metrics.ToolMetrics = None):
+        """
+        `max_concurrency` is a global budget of in-flight tool calls shared by every tool.
+        `process_workers` sizes the worker-process pool used by isolation="process" tools
+        (default: one per CPU).
+        `metrics` collects per-tool call/error counts and latency (default: the process-wide collector).
+        """
         self._tools = {}
+        self._lazy = {}
+        self._lazy_lock = threading.Lock()
+        self._pure = set()
+        self._admissions = {}
+        self._global_slots = Slots(max_concurrency) if max_concurrency else None
+        self._process_workers = process_workers
+        self._process_pool = None
+        self._process_pool_lock = threading.Lock()
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else tool_metrics.get_metrics()
         self.logger = logging.getLogger("Axion.Registry")
 
-    def register(self, name, function):
-        """Registers a function under a tool name."""
+    def register(self, name, function, pure=False, max_concurrency=None, rate_limit=None, burst=None,
+                 isolation=None, timeout=None):
+        """
+        Registers a function (or coroutine function) under a tool name.
+        Pure tools are deterministic: their results are cached by tool name + arguments.
+        `max_concurrency` caps in-flight calls of this tool (bulkhead); `rate_limit`/`burst`
+        add a token bucket in calls per second.
+        isolation="process" runs a module-level function in a persistent worker process
+        (for CPU-bound tools); `timeout` bounds each call, in seconds. It is only accepted
+        with process isolation, since an in-thread call cannot be interrupted.
+        """
         if not callable(function):
             raise ValueError(f"Tool {name} must be a callable function.")
+        if timeout is not None and isolation != "process":
+            raise ValueError(f"Tool {name}: timeout is only enforced with isolation=\"process\".")
+        if isolation == "process":
+            if inspect.iscoroutinefunction(function):
+                raise ValueError(f"Tool {name}: coroutine functions cannot run in a worker process.")
+            function = functools.partial(self._call_in_process, function_target(function), timeout)
+        elif isolation is not None:
+            raise ValueError(f"Tool {name}: unknown isolation {isolation!r}.")
         self._tools[name] = function
+        if pure:
+            self._pure.add(name)
+            if self.cache is None:
+                self.cache = ResultCache()
+        else:
+            self._pure.discard(name)
+
+        if max_concurrency or rate_limit or self._global_slots is not None:
+            self._admissions[name] = Admission(max_concurrency, rate_limit, burst, self._global_slots)
+        else:
+            self._admissions.pop(name, None)
         self.logger.debug(f"Registered tool: {name}")
 
+    def register_lazy(self, name, target, **options):
+        """
+        Records a tool by import path ("package.module:attribute") without importing it.
+        The module is imported on the first invoke; `options` are passed to register() then.
+        Paths starting with "." are relative to this package (src.core.tools).
+        """
+        if ":" not in target:
+            raise ValueError(f"Tool {name} import path must look like 'module:attribute', got {target!r}.")
+        with self._lazy_lock:
+            self._lazy[name] = (target, options)
+        self._tools.pop(name, None)
+        self.logger.debug(f"Registered lazy tool: {name} -> {target}")
+
+    def load_manifest(self, path=DEFAULT_MANIFEST):
+        """Lazily registers every tool listed in a JSON manifest: {"tools": [{"name", "import", ...options}]}."""
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        for entry in manifest.get("tools", []):
+            options = {k: v for k, v in entry.items() if k not in ("name", "import")}
+            self.register_lazy(entry["name"], entry["import"], **options)
+
+    def discover_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Lazily registers tools published by installed packages under an entry-point group."""
+        for entry_point in importlib.metadata.entry_points(group=group):
+            self.register_lazy(entry_point.name, entry_point.value)
+
+    @classmethod
+    def with_default_tools(cls, **kwargs):
+        """A registry with the built-in tools from manifest.json (nothing imported yet)."""
+        registry = cls(**kwargs)
+        registry.load_manifest(DEFAULT_MANIFEST)
+        return registry
+
+    def __contains__(self, tool_name):
+        return tool_name in self._tools or tool_name in self._lazy
+
+    def _lookup(self, tool_name):
+        tool = self._tools.get(tool_name)
+        if tool is not None:
+            return tool
+
+        with self._lazy_lock:
+            # Another thread may have imported it (and dropped the lazy entry) since the
+            # unlocked read, so only a miss under the lock means the tool does not exist.
+            tool = self._tools.get(tool_name)
+            if tool is not None or tool_name not in self._lazy:
+                return tool
+            target, options = self._lazy[tool_name]
+            module_name, _, attribute = target.partition(":")
+            self.logger.debug(f"Importing lazy tool: {tool_name} from {module_name}")
+            module = importlib.import_module(module_name, package=__package__)
+            function = getattr(module, attribute)
+            self.register(tool_name, function, **options)
+            del self._lazy[tool_name]
+            # register() may have wrapped it (e.g. isolation="process").
+            return self._tools[tool_name]
+
+    def _call_in_process(self, target, timeout, **kwargs):
+        if self._process_pool is None:
+            with self._process_pool_lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessToolPool(self._process_workers)
+        return self._process_pool.call(target, kwargs, timeout=timeout)
+
+    def close(self):
+        """Stops the worker processes behind isolation="process" tools, if any were started."""
+        with self._process_pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.close()
+
+    def queue_stats(self):
+        """Admission queue-wait metrics per rate/concurrency-limited tool."""
+        return {name: admission.stats.as_dict() for name, admission in self._admissions.items()}
+
     def invoke(self, tool_name, **kwargs):
         """Invokes a registered tool by name with arguments."""
-        tool = self._tools.get(tool_name)
+        start = time.perf_counter()
+        with tracing.span(tool_name, "tool"):
+            result = self._invoke(tool_name, kwargs)
+        self._observe(tool_name, start, result)
+        return result
+
+    def _invoke(self, tool_name, kwargs):
+        try:
+            tool = self._lookup(tool_name)
+        except Exception as e:
+            self.logger.exception(f"Tool import failed: {tool_name}")
+            return {"status": "error", "message": f"Tool import failed: {tool_name}: {e}"}
         if not tool:
             error_msg = f"Tool not found: {tool_name}"
             self.logger.error(error_msg)
             return {"status": "error", "message": error_msg}
 
+        key = self._cache_key(tool_name, kwargs)
+        if key is not None:
+            hit, cached = self.cache.get(key)
+            if hit:
+                self.logger.debug(f"Cache hit for tool: {tool_name}")
+                return cached
+
+        admission = self._admissions.get(tool_name)
+        if admission is not None:
+            self.metrics.observe_queue_wait(tool_name, admission.acquire())
         try:
             self.logger.info(f"Invoking tool: {tool_name}")
-            result = tool(**kwargs)
-            return result
+            if inspect.iscoroutinefunction(tool):
+                # Sync callers of an async tool get their own short-lived loop.
+                result = asyncio.run(tool(**kwargs))
+            else:
+                result = tool(**kwargs)
         except Exception as e:
             self.logger.exception(f"Tool execution failed: {tool_name}")
             return {"status": "error", "message": str(e)}
+        finally:
+            if admission is not None:
+                admission.release()
+
+        self._store(key, result)
+        return result
+
+    async def ainvoke(self, tool_name, **kwargs):
+        """
+        Awaitable variant of invoke().
+        Coroutine tools are awaited directly; sync tools are offloaded to the loop's default executor.
+        """
+        start = time.perf_counter()
+        with tracing.span(tool_name, "tool"):
+            result = await self._ainvoke(tool_name, kwargs)
+        self._observe(tool_name, start, result)
+        return result
+
+    async def _ainvoke(self, tool_name, kwargs):
+        try:
+            tool = self._lookup(tool_name)
+        except Exception as e:
+            self.logger.exception(f"Tool import failed: {tool_name}")
+            return {"status": "error", "message": f"Tool import failed: {tool_name}: {e}"}
+        if not tool:
+            error_msg = f"Tool not found: {tool_name}"
+            self.logger.error(error_msg)
+            return {"status": "error", "message": error_msg}
+
+        key = self._cache_key(tool_name, kwargs)
+        if key is not None:
+            hit, cached = self.cache.get(key)
+            if hit:
+                self.logger.debug(f"Cache hit for tool: {tool_name}")
+                return cached
+
+        admission = self._admissions.get(tool_name)
+        if admission is not None:
+            self.metrics.observe_queue_wait(tool_name, await admission.acquire_async())
+        try:
+            self.logger.info(f"Invoking tool: {tool_name}")
+            if inspect.iscoroutinefunction(tool):
+                result = await tool(**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                # Carry contextvars (e.g. an active workspace overlay) into the worker thread.
+                call = functools.partial(contextvars.copy_context().run, tool, **kwargs)
+                result = await loop.run_in_executor(None, call)
+        except Exception as e:
+            self.logger.exception(f"Tool execution failed: {tool_name}")
+            return {"status": "error", "message": str(e)}
+        finally:
+            if admission is not None:
+                admission.release()
+
+        self._store(key, result)
+        return result
+
+    def _observe(self, tool_name, start, result):
+        error = isinstance(result, dict) and result.get("status") == "error"
+        self.metrics.observe(tool_name, time.perf_counter() - start, error)
+
+    def _cache_key(self, tool_name, kwargs):
+        if tool_name not in self._pure:
+            return None
+        return make_key(tool_name, kwargs)
+
+    def _store(self, key, result):
+        # Errors are never cached so a transient failure is retried next time.
+        if key is None or (isinstance(result, dict) and result.get("status") == "error"):
+            return
+        self.cache.put(key, result)
@@ -0,0 +1,313 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger("Axion.Sandbox")
+
+SANDBOX_IMAGE = "python:3.10-slim"
+# Every pooled container carries this label (value: the owning process's pid),
+# so strays left by a killed interpreter can be found with reap_stray_containers().
+SANDBOX_LABEL = "axion.sandbox.owner"
+
+
+# realpath of the project root, resolved on first use rather than on every access.
+_sandbox_root = None
+_sandbox_root_lock = threading.Lock()
+
+
+def sandbox_root():
+    global _sandbox_root
+    root = _sandbox_root
+    if root is None:
+        with _sandbox_root_lock:
+            if _sandbox_root is None:
+                _sandbox_root = os.path.realpath(os.getcwd())
+            root = _sandbox_root
+    return root
+
+
+def configure_sandbox_root(path: str = None):
+    """Pins the sandbox root to `path`, or (with None) re-resolves it from the cwd on next use."""
+    global _sandbox_root
+    with _sandbox_root_lock:
+        _sandbox_root = os.path.realpath(path) if path is not None else None
+
+
+class SandboxError(Exception):
+    """The sandbox worker itself failed (as opposed to the command exiting non-zero)."""
+    pass
+
+
+class DockerWorker:
+    """A long-lived container that commands are `docker exec`'d into."""
+    def __init__(self, workspace):
+        result = subprocess.run(
+            ["docker", "run", "-d", "--rm",
+             "--label", f"{SANDBOX_LABEL}={os.getpid()}",
+             "-v", f"{workspace}:/app",
+             "-w", "/app",
+             SANDBOX_IMAGE,
+             "sleep", "infinity"],
+            capture_output=True, text=True, check=False,
+        )
+        if result.returncode != 0:
+            raise SandboxError(f"Could not start sandbox container: {result.stderr.strip()}")
+        self.container_id = result.stdout.strip()
+
+    def run(self, cmd, timeout=None):
+        try:
+            result = subprocess.run(
+                ["docker", "exec", self.container_id, "/bin/sh", "-c", cmd],
+                capture_output=True, text=True, check=False, timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            # The exec'd process may still be running inside the container: retire the worker.
+            raise SandboxError(f"Command timed out after {timeout}s")
+        return result.returncode, result.stdout, result.stderr
+
+    def healthy(self):
+        result = subprocess.run(
+            ["docker", "exec", self.container_id, "true"],
+            capture_output=True, check=False,
+        )
+        return result.returncode == 0
+
+    def close(self):
+        subprocess.run(["docker", "rm", "-f", self.container_id], capture_output=True, check=False)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reap_stray_containers():
+    """
+    Removes sandbox containers whose owning process is gone (e.g. killed before
+    its atexit hook ran). Returns the removed container ids.
+    """
+    listing = subprocess.run(
+        ["docker", "ps", "-a", "--filter", f"label={SANDBOX_LABEL}",
+         "--format", f'{{{{.ID}}}} {{{{.Label "{SANDBOX_LABEL}"}}}}'],
+        capture_output=True, text=True, check=False,
+    )
+    if listing.returncode != 0:
+        raise SandboxError(f"Could not list sandbox containers: {listing.stderr.strip()}")
+
+    stray = []
+    for line in listing.stdout.splitlines():
+        container_id, _, owner = line.partition(" ")
+        if not owner.strip().isdigit() or not _pid_alive(int(owner)):
+            stray.append(container_id)
+    if stray:
+        subprocess.run(["docker", "rm", "-f", *stray], capture_output=True, check=False)
+        logger.info(f"Reaped {len(stray)} stray sandbox container(s).")
+    return stray
+
+
+# Runs inside each LocalWorker process: one JSON request per stdin line, one JSON reply per stdout line.
+_LOCAL_WORKER_LOOP = r"""
+import json, subprocess, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("ping"):
+        reply = {"pong": True}
+    else:
+        try:
+            done = subprocess.run(["/bin/sh", "-c", request["cmd"]], capture_output=True, text=True,
+                                  timeout=request.get("timeout"), stdin=subprocess.DEVNULL)
+            reply = {"exit_code": done.returncode, "stdout": done.stdout, "stderr": done.stderr}
+        except subprocess.TimeoutExpired:
+            reply = {"timeout": True}
+    sys.stdout.write(json.dumps(reply) + "\n")
+    sys.stdout.flush()
+"""
+
+
+class LocalWorker:
+    """
+    Stand-in backend for machines without Docker: a persistent subprocess in its own
+    session with a scrubbed environment, rooted at the workspace. Not a security boundary.
+    """
+    def __init__(self, workspace):
+        env = {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": workspace, "LANG": "C.UTF-8"}
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", "-c", _LOCAL_WORKER_LOOP],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=workspace, env=env, text=True, start_new_session=True,
+        )
+
+    def _request(self, payload):
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (OSError, ValueError) as e:
+            raise SandboxError(f"Sandbox worker unreachable: {e}")
+        if not line:
+            raise SandboxError("Sandbox worker exited unexpectedly.")
+        return json.loads(line)
+
+    def run(self, cmd, timeout=None):
+        reply = self._request({"cmd": cmd, "timeout": timeout})
+        if reply.get("timeout"):
+            raise SandboxError(f"Command timed out after {timeout}s")
+        return reply["exit_code"], reply["stdout"], reply["stderr"]
+
+    def healthy(self):
+        if self.process.poll() is not None:
+            return False
+        try:
+            return self._request({"ping": True}).get("pong", False)
+        except SandboxError:
+            return False
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+BACKENDS = {"docker": DockerWorker, "local": LocalWorker}
+
+
+class SandboxPool:
+    """
+    A fixed-size pool of warm sandbox workers.
+
+    Workers are started lazily up to `size`, health-checked when they have sat
+    idle longer than `health_check_interval` seconds, and recycled after
+    `max_uses` commands or as soon as they fail.
+    """
+    def __init__(self, backend="docker", size=2, max_uses=100, health_check_interval=30.0, workspace=None):
+        self.factory = BACKENDS[backend] if isinstance(backend, str) else backend
+        self.size = size
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+        self.workspace = workspace or sandbox_root()
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._closed = False
+
+    def run(self, cmd, timeout=None):
+        """Runs `cmd` in a pooled worker. Returns the same dict shape as run_command."""
+        try:
+            worker, uses = self._acquire()
+        except Exception as e:
+            logger.error(f"No sandbox worker available: {e}")
+            return {"status": "error", "message": str(e)}
+
+        try:
+            exit_code, stdout, stderr = worker.run(cmd, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Sandbox worker failed, recycling: {e}")
+            self._retire(worker)
+            return {"status": "error", "message": str(e)}
+
+        self._release(worker, uses + 1)
+        if exit_code != 0:
+            return {"status": "error", "output": stderr, "exit_code": exit_code}
+        return {"status": "success", "output": stdout}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker)
+
+    def _acquire(self):
+        while True:
+            try:
+                worker, uses, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._closed:
+                        raise SandboxError("Sandbox pool is closed.")
+                    can_start = self._started < self.size
+                    if can_start:
+                        self._started += 1
+                if can_start:
+                    try:
+                        return self.factory(self.workspace), 0
+                    except Exception:
+                        with self._lock:
+                            self._started -= 1
+                        raise
+                try:
+                    # Poll rather than block forever: a busy worker may be retired instead of returned.
+                    worker, uses, idle_since = self._idle.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+            if time.monotonic() - idle_since < self.health_check_interval or worker.healthy():
+                return worker, uses
+            logger.warning("Sandbox worker failed health check, recycling.")
+            self._retire(worker)
+
+    def _release(self, worker, uses):
+        if uses >= self.max_uses or self._closed:
+            self._retire(worker)
+            return
+        self._idle.put((worker, uses, time.monotonic()))
+
+    def _retire(self, worker):
+        try:
+            worker.close()
+        except Exception as e:
+            logger.warning(f"Error closing sandbox worker: {e}")
+        with self._lock:
+            self._started -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_atexit_registered = False
+
+
+def configure_sandbox_pool(**kwargs):
+    """
+    Installs the process-wide pool used by run_command (replacing any existing one).
+    The pool is shut down at interpreter exit, so its containers do not outlive the run.
+    """
+    global _pool, _atexit_registered
+    with _pool_lock:
+        previous, _pool = _pool, SandboxPool(**kwargs)
+        if not _atexit_registered:
+            atexit.register(shutdown_sandbox_pool)
+            _atexit_registered = True
+    if previous is not None:
+        previous.close()
+    return _pool
+
+
+def get_sandbox_pool():
+    return _pool
+
+
+def shutdown_sandbox_pool():
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, None
+    if previous is not None:
+        previous.close()
@@ -1,66 +1,198 @@
+import codecs
 import os
 import logging
+import selectors
 import subprocess
 import shutil
+import tempfile
+import threading
+
+from . import fileio
+from .overlay import active_overlay
+from .sandbox import SANDBOX_IMAGE, configure_sandbox_root, get_sandbox_pool, sandbox_root
+from .workspace import get_command_cache
 
 logger = logging.getLogger("Axion.SystemTools")
 
+# Unranged reads above this size are paged (the WORKFLOW_RULES.md "Large Payload" rule).
+LARGE_FILE_BYTES = 1024 * 1024
+
 def _enforce_sandbox(target_path: str):
     """
     Ensures the target path is within the project root.
     """
-    root_dir = os.getcwd()
-    abs_target = os.path.abspath(target_path)
+    root_dir = sandbox_root()
+    abs_target = os.path.normpath(os.path.join(root_dir, target_path))
 
     # Check common path to ensure it's inside root
     if os.path.commonpath([root_dir, abs_target]) != root_dir:
-        raise PermissionError(f"Sandboxing Violation: Access to {target_path} denied.")
+        # An absolute path may reach the root through a symlink (e.g. /tmp -> /private/tmp).
+        abs_target = os.path.realpath(abs_target)
+        if os.path.commonpath([root_dir, abs_target]) != root_dir:
+            raise PermissionError(f"Sandboxing Violation: Access to {target_path} denied.")
     return abs_target
 
-def read_file(path: str):
-    """Safely reads a file."""
+def read_file(path: str, offset: int = None, length: int = None,
+              start_line: int = None, end_line: int = None, full: bool = False):
+    """
+    Safely reads a file.
+
+    Ranged reads: `offset`/`length` select bytes, `start_line`/`end_line` (1-based,
+    inclusive) select lines via a cached line index. Without a range, files over
+    LARGE_FILE_BYTES return only their first page with `truncated` set (the
+    WORKFLOW_RULES 1MB Large Payload rule); pass `full=True` for a deliberate deep dive.
+
+    Every mode returns text with newlines translated as text-mode open() does.
+    Byte pages are trimmed to whole UTF-8 characters; `offset`/`next_offset` report
+    the bytes actually covered, so feeding `next_offset` back in pages losslessly.
+    """
     try:
         safe_path = _enforce_sandbox(path)
-        if not os.path.exists(safe_path):
+        overlay = active_overlay()
+        if overlay is not None:
+            staged = overlay.read(safe_path)
+            if staged is not None:
+                return _read_staged(staged, offset, length, start_line, end_line)
+
+        try:
+            st = os.stat(safe_path)
+        except FileNotFoundError:
             return {"status": "error", "message": "File not found"}
 
-        with open(safe_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if start_line is not None or end_line is not None:
+            index = fileio.line_index(safe_path)
+            last = index.line_count if end_line is None else end_line
+            offset, length = index.span(start_line or 1, last)
+            data = fileio.read_range(safe_path, offset, length)
+            return {
+                "status": "success",
+                "content": fileio.decode_page(data, offset, None)[0],
+                "start_line": start_line or 1,
+                "end_line": min(last, index.line_count),
+                "total_lines": index.line_count,
+            }
+
+        size = st.st_size
+        if offset is not None or length is not None or (size > LARGE_FILE_BYTES and not full):
+            offset = max(0, min(offset or 0, size))
+            if length is None and not full:
+                length = LARGE_FILE_BYTES
+            slack = fileio.PAGE_SLACK if length is not None else 0
+            data = fileio.read_range(safe_path, offset, None if length is None else length + slack)
+            content, offset, next_offset = fileio.decode_page(data, offset, length)
+            return {
+                "status": "success",
+                "content": content,
+                "offset": offset,
+                "next_offset": next_offset,
+                "size": size,
+                "truncated": next_offset < size,
+            }
+
+        content = fileio.content_cache.get(safe_path, st)
+        if content is None:
+            with open(safe_path, 'r', encoding='utf-8') as f:
+                # Key by the opened file's stat so a concurrent rewrite can only cause a miss.
+                st = os.fstat(f.fileno())
+                content = f.read()
+            fileio.content_cache.put(safe_path, st, content)
         return {"status": "success", "content": content}
     except Exception as e:
         logger.error(f"read_file failed: {e}")
         return {"status": "error", "message": str(e)}
 
+def _read_staged(content, offset, length, start_line, end_line):
+    """read_file semantics over content staged in a WorkspaceOverlay."""
+    if start_line is not None or end_line is not None:
+        lines = content.splitlines(keepends=True)
+        first = max(1, start_line or 1)
+        last = len(lines) if end_line is None else min(end_line, len(lines))
+        return {
+            "status": "success",
+            "content": fileio.decode_page("".join(lines[first - 1:last]).encode('utf-8'), 0, None)[0],
+            "start_line": first,
+            "end_line": last,
+            "total_lines": len(lines),
+        }
+
+    if offset is not None or length is not None:
+        data = content.encode('utf-8')
+        offset = max(0, min(offset or 0, len(data)))
+        end = len(data) if length is None else offset + length + fileio.PAGE_SLACK
+        text, offset, next_offset = fileio.decode_page(data[offset:end], offset, length)
+        return {
+            "status": "success",
+            "content": text,
+            "offset": offset,
+            "next_offset": next_offset,
+            "size": len(data),
+            "truncated": next_offset < len(data),
+        }
+
+    return {"status": "success", "content": content.replace('\r\n', '\n').replace('\r', '\n')}
+
+def iter_file_chunks(path: str, chunk_size: int = 1024 * 1024, offset: int = 0):
+    """Yields a sandboxed file as byte chunks, for paging through files too large to read at once."""
+    safe_path = _enforce_sandbox(path)
+    yield from fileio.iter_chunks(safe_path, chunk_size, offset)
+
+def map_file(path: str):
+    """Context manager yielding a zero-copy memoryview over a sandboxed file (mmap-backed)."""
+    return fileio.map_file(_enforce_sandbox(path))
+
 def write_file(path: str, content: str):
     """Safely writes to a file."""
     try:
         safe_path = _enforce_sandbox(path)
+        overlay = active_overlay()
+        if overlay is not None:
+            # Inside a transactional run: stage in memory until the graph succeeds.
+            overlay.write(safe_path, content)
+            return {"status": "success", "message": f"Staged write to {path}"}
+
         # Ensure directory exists
         os.makedirs(os.path.dirname(safe_path), exist_ok=True)
 
         with open(safe_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        fileio.content_cache.invalidate(safe_path)
         return {"status": "success", "message": f"Written to {path}"}
     except Exception as e:
         logger.error(f"write_file failed: {e}")
         return {"status": "error", "message": str(e)}
 
+def _docker_argv(cmd: str):
+    return [
+        "docker", "run", "--rm",
+        "-v", f"{sandbox_root()}:/app",
+        "-w", "/app",
+        SANDBOX_IMAGE,
+        "/bin/sh", "-c", cmd
+    ]
+
 def run_command(cmd: str):
     """
     Executes a shell command in a hardened Docker container.
+    Uses the warm worker pool when one is configured (see sandbox.configure_sandbox_pool).
+    With a command cache configured (workspace.configure_command_cache), a command already
+    run against an identical workspace tree returns its stored result without a container.
     """
+    command_cache = get_command_cache()
+    if command_cache is not None:
+        return command_cache.run(cmd, sandbox_root(), _run_command)
+    return _run_command(cmd)
+
+def _run_command(cmd: str):
+    pool = get_sandbox_pool()
+    if pool is not None:
+        logger.info(f"Executing in Sandbox Pool: {cmd}")
+        return pool.run(cmd)
+
     if not shutil.which("docker"):
         logger.critical("Docker not found. Execution blocked for security.")
         return {"status": "error", "message": "CRITICAL: Docker not found. Cannot execute command safely."}
 
-    cwd = os.getcwd()
-    docker_cmd = [
-        "docker", "run", "--rm",
-        "-v", f"{cwd}:/app",
-        "-w", "/app",
-        "python:3.10-slim",
-        "/bin/sh", "-c", cmd
-    ]
+    docker_cmd = _docker_argv(cmd)
 
     try:
         logger.info(f"Executing in Sandbox: {cmd}")
@@ -79,3 +211,191 @@ def run_command(cmd: str):
     except Exception as e:
         logger.error(f"Sandbox execution failed: {e}")
         return {"status": "error", "message": str(e)}
+
+
+class BoundedOutput:
+    """
+    Captures a byte stream in bounded memory.
+    Keeps the first `head_bytes` and last `tail_bytes`; anything in between is spilled to a temp file.
+    Both windows are cut on UTF-8 character boundaries (so each may be up to 3 bytes short).
+    The spill file outlives close() so its path can be handed out; discard() deletes it.
+    """
+    def __init__(self, head_bytes=64 * 1024, tail_bytes=64 * 1024):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self.spill_path = None
+        self._head = bytearray()
+        self._head_sealed = False
+        self._tail = bytearray()
+        self._spill = None
+
+    def write(self, data: bytes):
+        self.total_bytes += len(data)
+        if not self._head_sealed:
+            if len(self._head) + len(data) <= self.head_bytes:
+                self._head += data
+                return
+            # The head is complete: cut it on a character boundary, the rest starts the tail.
+            self._head_sealed = True
+            self._head += data
+            cut = fileio.char_boundary(self._head, self.head_bytes)
+            data = bytes(self._head[cut:])
+            del self._head[cut:]
+
+        self._tail += data
+        # Spill in bulk once the window has doubled, so trimming stays amortised O(n).
+        if len(self._tail) > 2 * self.tail_bytes:
+            self._spill_overflow()
+
+    def _spill_overflow(self):
+        """Moves everything before the final tail window into the spill file."""
+        if self._spill is None:
+            self._spill = tempfile.NamedTemporaryFile(prefix="axion-output-", suffix=".log", delete=False)
+            self.spill_path = self._spill.name
+        overflow = fileio.char_boundary(self._tail, len(self._tail) - self.tail_bytes, forward=True)
+        if overflow > 0:
+            self._spill.write(self._tail[:overflow])
+            del self._tail[:overflow]
+
+    @property
+    def truncated(self):
+        return self.total_bytes > self.head_bytes + self.tail_bytes
+
+    def close(self):
+        # Whatever is still buffered ahead of the tail window was elided too;
+        # every truncated capture gets a spill file holding the full middle.
+        if self.truncated and not (self._spill is not None and self._spill.closed):
+            self._spill_overflow()
+        if self._spill is not None:
+            self._spill.close()
+
+    def discard(self):
+        """Closes the capture and deletes its spill file, if any."""
+        self.close()
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+            self.spill_path = None
+
+    def text(self):
+        """Head + tail as text, with a marker where the middle was elided."""
+        head = self._head.decode('utf-8', errors='replace')
+        tail = bytes(self._tail)
+        if not self.truncated:
+            return head + tail.decode('utf-8', errors='replace')
+
+        if len(tail) > self.tail_bytes:
+            tail = tail[fileio.char_boundary(tail, len(tail) - self.tail_bytes, forward=True):]
+        omitted = self.total_bytes - len(self._head) - len(tail)
+        where = f"full middle section in {self.spill_path}" if self.spill_path else "spill file discarded"
+        marker = f"\n... [{omitted} bytes omitted, {where}] ...\n"
+        return head + marker + tail.decode('utf-8', errors='replace')
+
+
+class CommandStream:
+    """
+    Runs a process and yields ("stdout" | "stderr", text) chunks as they arrive.
+    Both streams are also captured in BoundedOutput buffers; `exit_code` is set once iteration ends.
+    """
+    def __init__(self, argv, head_bytes=64 * 1024, tail_bytes=64 * 1024):
+        self.argv = argv
+        self.exit_code = None
+        self.stdout = BoundedOutput(head_bytes, tail_bytes)
+        self.stderr = BoundedOutput(head_bytes, tail_bytes)
+
+    def __iter__(self):
+        process = subprocess.Popen(self.argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL)
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ, ("stdout", self.stdout, codecs.getincrementaldecoder('utf-8')('replace')))
+        selector.register(process.stderr, selectors.EVENT_READ, ("stderr", self.stderr, codecs.getincrementaldecoder('utf-8')('replace')))
+
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    name, buffer, decoder = key.data
+                    data = os.read(key.fd, 64 * 1024)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                        text = decoder.decode(b"", final=True)
+                    else:
+                        buffer.write(data)
+                        text = decoder.decode(data)
+                    if text:
+                        yield name, text
+            self.exit_code = process.wait()
+        finally:
+            selector.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            self.stdout.close()
+            self.stderr.close()
+
+    def result(self):
+        """
+        The run_command-shaped result, plus truncation details. The other stream's spill
+        file is deleted; the reported `spill_path` belongs to the caller (see remove_spill()).
+        """
+        output, other = (self.stdout, self.stderr) if self.exit_code == 0 else (self.stderr, self.stdout)
+        other.discard()
+        result = {
+            "status": "success" if self.exit_code == 0 else "error",
+            "output": output.text(),
+            "truncated": output.truncated,
+            "total_bytes": output.total_bytes,
+            "spill_path": output.spill_path,
+        }
+        if self.exit_code != 0:
+            result["exit_code"] = self.exit_code
+        return result
+
+    def discard(self):
+        """Deletes both streams' spill files, e.g. when the result will not be used."""
+        self.stdout.discard()
+        self.stderr.discard()
+
+
+def remove_spill(result: dict):
+    """Deletes the spill file a streaming result points to, once its full output is no longer needed."""
+    path = result.get("spill_path")
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def stream_command(cmd: str, head_bytes=64 * 1024, tail_bytes=64 * 1024):
+    """
+    Streaming variant of run_command: returns a CommandStream to iterate over.
+    Memory use is bounded by head_bytes + tail_bytes per stream.
+    """
+    if not shutil.which("docker"):
+        logger.critical("Docker not found. Execution blocked for security.")
+        raise PermissionError("CRITICAL: Docker not found. Cannot execute command safely.")
+
+    logger.info(f"Streaming in Sandbox: {cmd}")
+    return CommandStream(_docker_argv(cmd), head_bytes, tail_bytes)
+
+def run_command_streaming(cmd: str, on_output=None, head_bytes=64 * 1024, tail_bytes=64 * 1024):
+    """
+    Like run_command, but output is delivered incrementally to `on_output(stream_name, text)`
+    and the returned output is capped to head/tail windows (the middle is spilled to a temp file
+    at `spill_path`, which the caller removes with remove_spill()).
+    """
+    stream = None
+    try:
+        stream = stream_command(cmd, head_bytes, tail_bytes)
+        for name, text in stream:
+            if on_output is not None:
+                on_output(name, text)
+        return stream.result()
+    except Exception as e:
+        if stream is not None:
+            stream.discard()
+        logger.error(f"Sandbox execution failed: {e}")
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,171 @@
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+logger = logging.getLogger("Axion.Workers")
+
+
+def function_target(function):
+    """The "module:qualname" a worker process uses to import `function`."""
+    qualname = getattr(function, "__qualname__", "")
+    module = getattr(function, "__module__", None)
+    if not module or "<" in qualname or module == "__main__":
+        raise ValueError(f"{function!r} must be a module-level function to run in a worker process.")
+    return f"{module}:{qualname}"
+
+
+def _resolve(target):
+    module_name, _, qualname = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _worker_main(conn):
+    """Worker loop: receive (target, kwargs), reply ("ok", result) or ("error", message)."""
+    functions = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        target, kwargs = message
+        try:
+            function = functions.get(target)
+            if function is None:
+                function = functions[target] = _resolve(target)
+            reply = ("ok", function(**kwargs))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Typically an unpicklable result.
+            conn.send(("error", f"Could not return result: {type(e).__name__}: {e}"))
+
+
+class _Worker:
+    __slots__ = ("process", "conn")
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, graceful=True):
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessToolPool:
+    """
+    Persistent worker processes for CPU-bound tools, so they run outside the executor's GIL.
+
+    Calls ship a "module:qualname" reference plus pickled kwargs. A worker that
+    times out is killed and replaced; one that dies mid-call is replaced and the
+    call returns {"status": "error", ...} like any other tool failure.
+    """
+    def __init__(self, size=None, start_method="spawn"):
+        self.size = size or os.cpu_count() or 1
+        # spawn by default: forking a process that runs thread pools is unsafe.
+        self._context = multiprocessing.get_context(start_method)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._closed = False
+
+    def call(self, target, kwargs, timeout=None):
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            logger.error(f"No worker process available: {e}")
+            return {"status": "error", "message": str(e)}
+
+        try:
+            worker.conn.send((target, kwargs))
+            if not worker.conn.poll(timeout):
+                logger.warning(f"Worker call timed out after {timeout}s: {target}")
+                self._replace(worker)
+                return {"status": "error", "message": f"Tool timed out after {timeout}s"}
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            worker.process.join(timeout=1)
+            exit_code = worker.process.exitcode
+            logger.error(f"Worker process died running {target} (exit code {exit_code}): {e}")
+            self._replace(worker)
+            return {"status": "error", "message": f"Worker process crashed (exit code {exit_code})"}
+        except Exception as e:
+            # e.g. unpicklable arguments; the worker never saw the call.
+            self._release(worker)
+            return {"status": "error", "message": f"Could not send call to worker: {type(e).__name__}: {e}"}
+
+        self._release(worker)
+        if status == "error":
+            return {"status": "error", "message": payload}
+        return payload
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+            with self._lock:
+                self._started -= 1
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Worker pool is closed.")
+                can_start = self._started < self.size
+                if can_start:
+                    self._started += 1
+            if can_start:
+                try:
+                    return _Worker(self._context)
+                except Exception:
+                    with self._lock:
+                        self._started -= 1
+                    raise
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _release(self, worker):
+        if self._closed:
+            worker.stop()
+            with self._lock:
+                self._started -= 1
+            return
+        self._idle.put(worker)
+
+    def _replace(self, worker):
+        worker.stop(graceful=False)
+        with self._lock:
+            self._started -= 1
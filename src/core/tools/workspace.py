@@ -0,0 +1,293 @@
+import hashlib
+import logging
+import os
+import stat
+import struct
+import threading
+import time
+
+from .cache import ResultCache, make_key
+
+logger = logging.getLogger("Axion.Workspace")
+
+# Directories that never affect a command's result (VCS metadata, bytecode, tool caches).
+SKIP_DIRS = frozenset({".git", "__pycache__", ".pytest_cache", ".mypy_cache", ".ruff_cache", ".hypothesis"})
+
+# A file modified this close to when it was hashed may change again without its
+# stat changing on coarse-timestamp filesystems ("racily clean"): re-hash it next time.
+_RACY_WINDOW_NS = 2_000_000_000
+
+_INDEX_HEADER = struct.Struct(">4sLL")
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size, sha1, flags
+_INDEX_ENTRY = struct.Struct(">LLLLLLLLLL20sH")
+
+
+def _git_dir(root):
+    """The repository directory for a work tree: .git itself, or where a .git file points (worktrees, submodules)."""
+    path = os.path.join(root, ".git")
+    if os.path.isfile(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                target = f.read().strip()
+        except OSError:
+            return None
+        if not target.startswith("gitdir:"):
+            return None
+        return os.path.normpath(os.path.join(root, target[len("gitdir:"):].strip()))
+    return path if os.path.isdir(path) else None
+
+
+def read_git_head(git_dir):
+    """
+    HEAD as "<ref> <commit>" (or just the commit when detached), resolving the ref
+    through loose refs and packed-refs. Returns None when there is no readable HEAD.
+    """
+    try:
+        with open(os.path.join(git_dir, "HEAD"), 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head
+    ref = head[len("ref:"):].strip()
+    # Linked worktrees keep branch refs in the main repository's directory.
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), 'r', encoding='utf-8') as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        pass
+    for directory in dict.fromkeys((git_dir, common_dir)):
+        try:
+            with open(os.path.join(directory, *ref.split("/")), 'r', encoding='utf-8') as f:
+                return f"{ref} {f.read().strip()}"
+        except OSError:
+            pass
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), 'r', encoding='utf-8') as f:
+            for line in f:
+                commit, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return f"{ref} {commit}"
+    except OSError:
+        pass
+    return ref  # unborn branch
+
+
+def blob_digest(data):
+    """Git's blob id for `data`, so digests taken from the index and from disk agree."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def read_git_index(index_path):
+    """
+    Parses a git index (versions 2 and 3) into
+    {relpath: (ctime_s, ctime_ns, mtime_s, mtime_ns, ino, size, sha1)}.
+    Returns {} for formats it does not understand (e.g. v4's compressed paths).
+    """
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    if len(data) < _INDEX_HEADER.size:
+        return {}
+    signature, version, count = _INDEX_HEADER.unpack_from(data, 0)
+    if signature != b"DIRC" or version not in (2, 3):
+        return {}
+
+    entries = {}
+    offset = _INDEX_HEADER.size
+    for _ in range(count):
+        fields = _INDEX_ENTRY.unpack_from(data, offset)
+        ino, size, sha1, flags = fields[5], fields[9], fields[10], fields[11]
+        path_start = offset + _INDEX_ENTRY.size
+        if version >= 3 and flags & 0x4000:
+            path_start += 2
+        path_end = data.index(b"\0", path_start)
+        # Entries are NUL-padded to a multiple of 8 bytes.
+        offset += (path_end - offset + 8) & ~7
+        if (flags >> 12) & 0x3:
+            continue  # unmerged stage: its content is not settled
+        path = data[path_start:path_end].decode('utf-8', errors='surrogateescape')
+        entries[path] = (fields[0], fields[1], fields[2], fields[3], ino, size, sha1.hex())
+    return entries
+
+
+class WorkspaceHasher:
+    """
+    Fast, incremental content hash of a directory tree.
+
+    Every call stats every file, but only reads files whose stat changed since
+    the last call. Files git has already hashed (index stat data still matches)
+    are not read at all. .git is not walked; instead the digest covers HEAD and
+    the index's stat, so git commands replay only while the repository state
+    (branch, commit, staged changes) is unchanged.
+    """
+    def __init__(self, root, skip_dirs=SKIP_DIRS, exclude=()):
+        self.root = os.path.realpath(root)
+        self.skip_dirs = frozenset(skip_dirs)
+        self.exclude = {os.path.realpath(path) for path in exclude}
+        self._files = {}  # relpath -> (mtime_ns, size, ino, digest, hashed_at_ns)
+        self._git_index = {}
+        self._git_index_stat = None
+        self._lock = threading.Lock()
+        self.files_read = 0
+
+    def digest(self):
+        with self._lock:
+            git_dir = _git_dir(self.root)
+            git_index, index_stat = self._load_git_index(git_dir)
+            index_mtime_ns = index_stat[0] if index_stat else 0
+            seen = {}
+            for relpath, st, is_link in self._walk():
+                seen[relpath] = self._file_digest(relpath, st, is_link, git_index, index_mtime_ns)
+            # Forget deleted files.
+            for relpath in self._files.keys() - seen.keys():
+                del self._files[relpath]
+
+        tree = hashlib.sha256()
+        if git_dir is not None:
+            tree.update(f"git HEAD={read_git_head(git_dir)} index={index_stat}\n".encode('utf-8', errors='surrogateescape'))
+        for relpath in sorted(seen):
+            tree.update(relpath.encode('utf-8', errors='surrogateescape'))
+            tree.update(b"\0")
+            tree.update(seen[relpath].encode('ascii'))
+            tree.update(b"\n")
+        return tree.hexdigest()
+
+    def _walk(self):
+        pending = [""]
+        while pending:
+            reldir = pending.pop()
+            try:
+                entries = os.scandir(os.path.join(self.root, reldir))
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    relpath = os.path.join(reldir, entry.name) if reldir else entry.name
+                    try:
+                        is_link = entry.is_symlink()
+                        if not is_link and entry.is_dir():
+                            if entry.name not in self.skip_dirs and entry.path not in self.exclude:
+                                pending.append(relpath)
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_link or stat.S_ISREG(st.st_mode):
+                        yield relpath, st, is_link
+
+    def _file_digest(self, relpath, st, is_link, git_index, index_mtime_ns):
+        cached = self._files.get(relpath)
+        if (cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size
+                and cached[2] == st.st_ino and st.st_mtime_ns < cached[4] - _RACY_WINDOW_NS):
+            return cached[3]
+
+        digest = None
+        entry = git_index.get(relpath.replace(os.sep, "/")) if not is_link else None
+        # The same stat fields git itself compares (core.checkStat=default), truncated to 32 bits as stored.
+        if (entry is not None
+                and entry[0] == (st.st_ctime_ns // 1_000_000_000) & 0xFFFFFFFF
+                and entry[1] == st.st_ctime_ns % 1_000_000_000
+                and entry[2] == (st.st_mtime_ns // 1_000_000_000) & 0xFFFFFFFF
+                and entry[3] == st.st_mtime_ns % 1_000_000_000
+                and entry[4] == st.st_ino & 0xFFFFFFFF
+                and entry[5] == st.st_size & 0xFFFFFFFF
+                and st.st_mtime_ns < index_mtime_ns):
+            digest = entry[6]
+        if digest is None:
+            path = os.path.join(self.root, relpath)
+            try:
+                if is_link:
+                    data = os.readlink(path).encode('utf-8', errors='surrogateescape')
+                else:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+            except OSError:
+                return "unreadable"
+            digest = blob_digest(data)
+            self.files_read += 1
+
+        self._files[relpath] = (st.st_mtime_ns, st.st_size, st.st_ino, digest, time.time_ns())
+        return digest
+
+    def _load_git_index(self, git_dir):
+        """Returns ({relpath: entry}, (mtime_ns, size) of the index or None)."""
+        if git_dir is None:
+            return {}, None
+        index_path = os.path.join(git_dir, "index")
+        try:
+            st = os.stat(index_path)
+        except OSError:
+            return {}, None
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._git_index_stat:
+            try:
+                self._git_index = read_git_index(index_path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Ignoring unreadable git index {index_path}: {e}")
+                self._git_index = {}
+            self._git_index_stat = key
+        return self._git_index, key
+
+
+class CommandCache:
+    """
+    Results of sandboxed commands keyed by command string + workspace tree hash.
+
+    A result is stored only if the command exited (success or non-zero exit code)
+    and left the workspace unchanged, so replaying it cannot skip a side effect.
+    """
+    def __init__(self, max_entries=256, ttl=None, disk_dir=None, skip_dirs=SKIP_DIRS):
+        self.results = ResultCache(max_entries=max_entries, ttl=ttl, disk_dir=disk_dir)
+        self.skip_dirs = skip_dirs
+        self._exclude = (disk_dir,) if disk_dir else ()
+        self._hashers = {}
+        self._lock = threading.Lock()
+
+    def hasher(self, root):
+        with self._lock:
+            hasher = self._hashers.get(root)
+            if hasher is None:
+                hasher = self._hashers[root] = WorkspaceHasher(root, self.skip_dirs, self._exclude)
+            return hasher
+
+    def run(self, cmd, root, runner):
+        """Returns the cached result for `cmd` in `root`'s current state, else runner(cmd)."""
+        hasher = self.hasher(root)
+        before = hasher.digest()
+        key = make_key("run_command", {"cmd": cmd, "workspace": before})
+        hit, cached = self.results.get(key)
+        if hit:
+            logger.info(f"Command cache hit: {cmd}")
+            cached["cached"] = True
+            return cached
+
+        result = runner(cmd)
+        if result.get("status") == "success" or "exit_code" in result:
+            if hasher.digest() == before:
+                self.results.put(key, result)
+            else:
+                logger.debug(f"Not caching {cmd!r}: it modified the workspace.")
+        return result
+
+
+_command_cache = None
+_command_cache_lock = threading.Lock()
+
+
+def configure_command_cache(**kwargs):
+    """Turns on run_command result caching (replacing any existing cache)."""
+    global _command_cache
+    with _command_cache_lock:
+        _command_cache = CommandCache(**kwargs)
+    return _command_cache
+
+
+def get_command_cache():
+    return _command_cache
+
+
+def disable_command_cache():
+    global _command_cache
+    with _command_cache_lock:
+        _command_cache = None
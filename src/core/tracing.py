@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# The active Tracer, or None. Hot paths read this once per span, so disabled tracing
+# costs a global lookup and a no-op context manager.
+_tracer = None
+
+
+class Tracer:
+    """
+    Collects completed spans in a fixed-size ring buffer.
+
+    Spans are appended to a bounded deque, whose append is atomic under the GIL,
+    so recording takes no lock; the oldest spans are overwritten when full.
+    Timestamps are time.monotonic_ns().
+    """
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.origin_ns = time.monotonic_ns()
+        self._spans = deque(maxlen=capacity)
+
+    def record(self, name, cat, start_ns, end_ns, args):
+        self._spans.append((name, cat, start_ns, end_ns, threading.get_ident(), args))
+
+    def spans(self):
+        """Snapshot of recorded spans as dicts, oldest first."""
+        return [
+            {"name": name, "cat": cat, "start_ns": start, "end_ns": end, "tid": tid, "args": args}
+            for name, cat, start, end, tid, args in list(self._spans)
+        ]
+
+    def clear(self):
+        self._spans.clear()
+
+    def export_chrome(self, path):
+        """Writes a Chrome trace-event file (load it in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": (span["start_ns"] - self.origin_ns) / 1000,
+                "dur": (span["end_ns"] - span["start_ns"]) / 1000,
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["args"],
+            }
+            for span in self.spans()
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def export_jsonl(self, path):
+        """Writes one span per line."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in self.spans():
+                f.write(json.dumps(span, default=str) + "\n")
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start_ns")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.monotonic_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.cat, self.start_ns, end_ns, self.args)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, cat="core", **args):
+    """Context manager timing a block. Returns a shared no-op when tracing is disabled."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def enable(capacity=65536):
+    """Starts recording into a fresh Tracer and returns it."""
+    global _tracer
+    _tracer = Tracer(capacity)
+    return _tracer
+
+
+def disable():
+    """Stops recording. Returns the Tracer that was active (for exporting), if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer():
+    return _tracer
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import os
 import sys
 import json
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 # Imports
 try:
     from src.core.bus import NexusBus
-    from src.core.context import load_context
-    from src.core.tools.graph_executor import GraphExecutor
+    from src.core.commands import get_workflow_registry
+    from src.core.context import get_loader, load_context
+    from src.core.metrics import get_metrics
+    from src.core.tools.graph_executor import GraphExecutor, SecurityError
 except ImportError as e:
     print(f"Error importing modules: {e}")
     sys.exit(1)
@@ -22,7 +28,7 @@ def generate_mock_graph(task_description):
 
     return {
         "graph_id": graph_id,
-        "intent_glyph": "🛡️🤖",
+        "intent_glyph": "🤖",
         "aether_mark": "mock_signature_verified",
         "entry_point": "node_1",
         "context_delta": {},
@@ -62,13 +68,145 @@ def generate_mock_graph(task_description):
         }
     }
 
+# Per-process state for --batch workers, built once by _init_batch_worker.
+_worker_bus = None
+_worker_executor = None
+
+def _init_batch_worker():
+    """Pays the schema, persona and executor startup cost once per worker process."""
+    global _worker_bus, _worker_executor
+    with contextlib.redirect_stdout(sys.stderr):
+        _worker_bus = NexusBus()
+        load_context("brain")
+        _worker_executor = GraphExecutor(_worker_bus)
+
+def _run_batch_item(index, line):
+    """
+    Runs one JSONL entry (a task or a pre-built graph). Returns its NDJSON result
+    record plus the tool metrics it produced, for the parent to merge.
+    """
+    start = time.perf_counter()
+    record = {"index": index}
+    try:
+        item = json.loads(line)
+        graph = item if "nodes" in item else generate_mock_graph(item["task"])
+        record["graph_id"] = graph.get("graph_id")
+
+        # Executor/bus chatter goes to stderr so stdout stays valid NDJSON.
+        with contextlib.redirect_stdout(sys.stderr):
+            _worker_bus.validate_graph(graph)
+            results = _worker_executor.execute(graph)
+
+        record["status"] = "success" if results.status == "completed" else results.status
+        record["nodes_run"] = len(results)
+        if results.status != "completed":
+            failing = [r for r in results.values() if r.get("status") != "success"]
+            if failing and failing[-1].get("message"):
+                record["message"] = failing[-1]["message"]
+    except Exception as e:
+        record["status"] = "error"
+        record["message"] = f"{type(e).__name__}: {e}"
+
+    record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record, get_metrics().export_state(reset=True)
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[rank]
+
+def run_batch(source, workers, out=sys.stdout):
+    """
+    Streams tasks/graphs from a JSONL file (or '-' for stdin) through a process pool.
+    Writes one NDJSON result per entry to `out` as entries finish, then a summary to stderr.
+    """
+    stream = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker) as pool:
+            # Bound in-flight work so huge inputs are streamed, not loaded up front.
+            max_in_flight = workers * 4
+            pending = set()
+            index = 0
+
+            def drain():
+                nonlocal pending, failed
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record, tool_metrics = future.result()
+                    get_metrics().merge_state(tool_metrics)
+                    latencies.append(record["duration_ms"])
+                    if record["status"] != "success":
+                        failed += 1
+                    out.write(json.dumps(record) + "\n")
+                out.flush()
+
+            for line in stream:
+                if not line.strip():
+                    continue
+                pending.add(pool.submit(_run_batch_item, index, line))
+                index += 1
+                if len(pending) >= max_in_flight:
+                    drain()
+
+            while pending:
+                drain()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    summary = {
+        "total": len(latencies),
+        "succeeded": len(latencies) - failed,
+        "failed": failed,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+    print(f"[BATCH] {json.dumps(summary)}", file=sys.stderr)
+    return summary
+
+def report_stats(show=False, prometheus_path=None):
+    """Dumps per-tool call/error counts and latency percentiles (stderr) and/or a Prometheus text file."""
+    metrics = get_metrics()
+    if show:
+        print(f"[STATS] {json.dumps(metrics.snapshot(), indent=2)}", file=sys.stderr)
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path)
+
 def main():
     parser = argparse.ArgumentParser(description="Agent System V3 Command Interface")
-    parser.add_argument("--task", type=str, help="The natural language task to perform")
+    parser.add_argument("--task", type=str,
+                        help="The natural language task to perform, or a slash command such as '/standup caching'")
     parser.add_argument("--file", type=str, help="A file to process")
+    parser.add_argument("--batch", type=str, metavar="JSONL",
+                        help="Run tasks or pre-built graphs from a JSONL file ('-' for stdin); streams NDJSON results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print per-tool call counts, error rates and latency percentiles when done")
+    parser.add_argument("--prometheus", type=str, metavar="PATH",
+                        help="Write tool metrics to PATH in Prometheus text format when done")
 
     args = parser.parse_args()
 
+    if args.batch:
+        summary = run_batch(args.batch, max(1, args.workers))
+        report_stats(args.stats, args.prometheus)
+        sys.exit(1 if summary["failed"] else 0)
+
     if not args.task and not args.file:
         parser.print_help()
         sys.exit(0)
@@ -95,16 +233,51 @@ def main():
         print(f"❌ Failed to load context: {e}")
         sys.exit(1)
 
+    # 2b. Route slash commands (COMMANDS.md) straight to their workflow
+    routed = None
+    if task.startswith("/"):
+        registry = get_workflow_registry()
+        routed, command_args = registry.resolve(task)
+        if routed is None:
+            head = task.split()[0]
+            suggestions = registry.search(head) or registry.search(head[:2]) or registry.names()
+            print(f"❌ Unknown command: {head}. Did you mean: {', '.join(suggestions)}")
+            sys.exit(1)
+        agents = ", ".join(routed["agents"]) or "none"
+        print(f"📜 Routed {routed['name']} → {routed['trigger'] or 'no workflow'} (agents: {agents})")
+        if routed["trigger"]:
+            try:
+                get_loader().load_file(routed["trigger"])
+            except FileNotFoundError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+        task = command_args or routed["description"]
+
     # 3. Generate Execution Graph (Brain)
     print(f"🧠 Brain: Analyzing task: '{task}'")
     graph = generate_mock_graph(task)
+    if routed is not None:
+        graph["context_delta"] = {
+            "command": routed["name"],
+            "workflow": routed["trigger"],
+            "agents": routed["agents"],
+        }
     print(f"✅ Generated Execution Graph ({graph['graph_id']})")
 
     # 4. Execute (Muscles)
     print("\n🚀 \033[1mExecuting Graph...\033[0m")
-    executor = GraphExecutor()
-    executor.execute(graph)
+    executor = GraphExecutor(bus)
+    try:
+        results = executor.execute(graph)
+    except SecurityError as e:
+        print(f"❌ Execution halted: {e}")
+        sys.exit(1)
+    finally:
+        report_stats(args.stats, args.prometheus)
 
+    if results.status != "completed":
+        print(f"\n❌ Graph {results.status}.")
+        sys.exit(1)
     print("\n✨ Mission Complete.")
 
 if __name__ == "__main__":
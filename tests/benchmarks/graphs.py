@@ -0,0 +1,59 @@
+"""Synthetic execution graphs for the core benchmarks."""
+import time
+
+
+def _graph(nodes, entry_point, shape, size):
+    return {
+        "graph_id": f"bench-{shape}-{size}",
+        "intent_glyph": "⚡",
+        "entry_point": entry_point,
+        "context_delta": {},
+        "nodes": nodes,
+    }
+
+
+def _tool_node(tool, **transitions):
+    node = {"action": "run_tool", "params": {"tool": tool, "args": {}}}
+    node.update(transitions)
+    return node
+
+
+def chain(size, tool="noop"):
+    """n0 -> n1 -> ... -> terminate."""
+    nodes = {f"n{i}": _tool_node(tool, next=f"n{i + 1}") for i in range(size - 1)}
+    nodes[f"n{size - 1}"] = {"action": "terminate"}
+    return _graph(nodes, "n0", "chain", size)
+
+
+def fan_out(size, tool="noop"):
+    """One root with size - 1 independent branches."""
+    nodes = {"root": {"action": "logic_gate", "params": {}}}
+    for i in range(size - 1):
+        nodes[f"b{i}"] = _tool_node(tool, depends_on=["root"])
+    return _graph(nodes, "root", "fan_out", size)
+
+
+def diamond(size, tool="noop"):
+    """root -> size - 2 parallel branches -> join."""
+    width = max(1, size - 2)
+    nodes = {"root": {"action": "logic_gate", "params": {}}}
+    branches = [f"b{i}" for i in range(width)]
+    for branch in branches:
+        nodes[branch] = _tool_node(tool, depends_on=["root"])
+    nodes["join"] = {"action": "terminate", "depends_on": branches}
+    return _graph(nodes, "root", "diamond", size)
+
+
+SHAPES = {"chain": chain, "fan_out": fan_out, "diamond": diamond}
+
+
+def noop():
+    return {"status": "success"}
+
+
+def latency_tool(seconds):
+    """A tool that simulates I/O wait."""
+    def tool():
+        time.sleep(seconds)
+        return {"status": "success"}
+    return tool
@@ -0,0 +1,203 @@
+"""
+Throughput benchmarks for the execution core (NexusBus, GraphExecutor, ToolRegistry).
+
+The throughput test is marked `benchmark` and deselected unless BENCH=1:
+
+    BENCH=1 python -m pytest tests/benchmarks
+
+or run the full sweep as a script from the repo root:
+
+    python -m tests.benchmarks.test_core_benchmarks --sizes 10,1000,100000 --save
+
+Environment knobs for the pytest run:
+    BENCH_SIZES      comma-separated node counts (default: 10,1000)
+    BENCH_BASELINE   baseline JSON path (default: tests/benchmarks/core_baseline.json)
+    BENCH_THRESHOLD  allowed throughput drop vs baseline, 0-1 (default: 0.25)
+    BENCH_SAVE=1     write the measured results as the new baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from src.core.analysis import analyze_graph
+from src.core.bus import NexusBus
+from src.core.plan import clear_plan_cache
+from src.core.tools.graph_executor import GraphExecutor
+from src.core.tools.registry import ToolRegistry
+from tests.benchmarks.graphs import SHAPES, latency_tool, noop
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "core_baseline.json")
+# Latency-injected runs sleep per node, so they are capped to keep the suite short.
+LATENCY_MAX_NODES = 200
+LATENCY_SECONDS = 0.001
+MIN_BENCH_SECONDS = 0.2
+
+
+def _measure(fn, work_units):
+    """Best-of runs until MIN_BENCH_SECONDS has elapsed. Returns units/second."""
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while spent < MIN_BENCH_SECONDS or runs < 3:
+        start = time.perf_counter()
+        fn()
+        duration = time.perf_counter() - start
+        best = min(best, duration)
+        spent += duration
+        runs += 1
+        if runs >= 3 and spent > MIN_BENCH_SECONDS * 10:
+            break
+    return work_units / best if best > 0 else float("inf")
+
+
+def _cold():
+    # Measure the uncached paths; the caches are benchmarked separately below.
+    clear_plan_cache()
+    NexusBus.clear_validation_cache()
+
+
+def _executor(tool):
+    executor = GraphExecutor(NexusBus())
+    executor.registry.register("noop", noop)
+    executor.registry.register("slow", tool)
+    return executor
+
+
+def run_benchmarks(sizes):
+    """Returns {benchmark_name: units_per_second}."""
+    results = {}
+    bus = NexusBus()
+    slow = latency_tool(LATENCY_SECONDS)
+
+    for size in sizes:
+        for shape, build in SHAPES.items():
+            graph = build(size)
+
+            def validate_cold():
+                _cold()
+                bus.validate_graph(graph)
+
+            def validate_warm():
+                bus.validate_graph(graph)
+
+            def analyze_cold():
+                clear_plan_cache()
+                analyze_graph(graph)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[f"validate_graph[{shape}-{size}]"] = _measure(validate_cold, size)
+                results[f"validate_graph_cached[{shape}-{size}]"] = _measure(validate_warm, size)
+            results[f"analyze_graph[{shape}-{size}]"] = _measure(analyze_cold, size)
+
+            executor = _executor(slow)
+            if shape == "chain":
+                def nexus_execute():
+                    _cold()
+                    bus.execute(graph)
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results[f"nexus_execute[{shape}-{size}]"] = _measure(nexus_execute, size)
+                results[f"executor_execute[{shape}-{size}]"] = _measure(lambda: executor.execute(graph), size)
+            else:
+                results[f"executor_parallel[{shape}-{size}]"] = _measure(
+                    lambda: executor.execute_parallel(graph, max_workers=8), size)
+
+            if size <= LATENCY_MAX_NODES:
+                slow_graph = build(size, tool="slow")
+                run = executor.execute if shape == "chain" else (
+                    lambda g: executor.execute_parallel(g, max_workers=8))
+                results[f"latency_{shape}[{size}]"] = _measure(lambda: run(slow_graph), size)
+
+    registry = ToolRegistry()
+    registry.register("noop", noop)
+    calls = 10_000
+    results["registry_invoke"] = _measure(lambda: [registry.invoke("noop") for _ in range(calls)], calls)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks whose throughput dropped more than `threshold` below baseline."""
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference and value < reference * (1 - threshold):
+            regressions.append(f"{name}: {value:,.0f}/s vs baseline {reference:,.0f}/s")
+    return regressions
+
+
+def _load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)["results"]
+
+
+def _save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2, sort_keys=True)
+
+
+@pytest.mark.benchmark
+def test_core_throughput_has_not_regressed():
+    sizes = [int(s) for s in os.environ.get("BENCH_SIZES", "10,1000").split(",")]
+    baseline_path = os.environ.get("BENCH_BASELINE", DEFAULT_BASELINE)
+    threshold = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+
+    results = run_benchmarks(sizes)
+    for name, value in sorted(results.items()):
+        print(f"{name}: {value:,.0f}/s")
+
+    if os.environ.get("BENCH_SAVE") == "1":
+        _save_baseline(baseline_path, results)
+
+    baseline = _load_baseline(baseline_path)
+    if baseline is None:
+        pytest.skip(f"No baseline at {baseline_path}; run with BENCH_SAVE=1 to record one.")
+
+    regressions = compare(results, baseline, threshold)
+    assert not regressions, "Throughput regressions:\n" + "\n".join(regressions)
+
+
+def test_compare_flags_only_drops_past_threshold():
+    baseline = {"a": 1000.0, "b": 1000.0}
+
+    assert compare({"a": 800.0, "b": 700.0, "new": 1.0}, baseline, threshold=0.25) == [
+        "b: 700/s vs baseline 1,000/s"
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execution core benchmarks")
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save", action="store_true", help="Record results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(s) for s in args.sizes.split(",")])
+    for name, value in sorted(results.items()):
+        print(f"{name}: {value:,.0f}/s")
+
+    if args.save:
+        _save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = _load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("Throughput regressions:\n" + "\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
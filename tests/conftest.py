@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# Make `src.core` importable when pytest is launched from anywhere in the repo.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.tools.system import configure_sandbox_root  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: throughput benchmark, only collected with BENCH=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselects `benchmark` tests unless BENCH=1, so the default run stays fast."""
+    if os.environ.get("BENCH") == "1":
+        return
+    benchmarks = [item for item in items if item.get_closest_marker("benchmark")]
+    if benchmarks:
+        config.hook.pytest_deselected(items=benchmarks)
+        items[:] = [item for item in items if not item.get_closest_marker("benchmark")]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A temp directory that is both the cwd and the sandbox root."""
+    monkeypatch.chdir(tmp_path)
+    configure_sandbox_root(str(tmp_path))
+    yield tmp_path
+    configure_sandbox_root()
+
+
+@pytest.fixture
+def new_file_mode(tmp_path):
+    """The permission bits a plain open() gives a new file under the current umask."""
+    probe = tmp_path / ".mode-probe"
+    probe.write_text("")
+    mode = os.stat(probe).st_mode & 0o777
+    probe.unlink()
+    return mode
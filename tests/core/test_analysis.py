@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from src.core.analysis import analyze_graph
+from src.core.plan import clear_plan_cache
+
+
+def make_graph(nodes, entry_point="a"):
+    return {"entry_point": entry_point, "nodes": nodes}
+
+
+def test_reports_structural_problems():
+    analysis = analyze_graph(make_graph({
+        "a": {"action": "logic_gate", "on_success": "b", "on_failure": "ghost"},
+        "b": {"action": "terminate"},
+        "island": {"action": "terminate"},
+    }))
+
+    assert analysis.dangling == [("a", "on_failure", "ghost")]
+    assert analysis.unreachable == ["island"]
+    assert analysis.cycles == []
+    assert analysis.acyclic
+    assert analysis.errors() == []
+
+
+def test_success_cycles_are_fatal_but_retry_loops_are_bounded():
+    unbounded = analyze_graph(make_graph({
+        "a": {"action": "logic_gate", "next": "b"},
+        "b": {"action": "logic_gate", "next": "a"},
+    }))
+    retry = analyze_graph(make_graph({
+        "a": {"action": "run_tool", "on_success": "done", "on_failure": "repair"},
+        "repair": {"action": "run_tool", "next": "a"},
+        "done": {"action": "terminate"},
+    }))
+
+    assert unbounded.success_cycles == [["a", "b"]]
+    assert unbounded.errors(retry_on_fail=True)
+    assert not retry.acyclic
+    assert retry.errors(retry_on_fail=False)
+    assert retry.errors(retry_on_fail=True) == []
+
+
+def test_cycles_follow_the_transitions_the_executor_takes():
+    # on_success wins over next, so the backward `next` edges are never taken.
+    shadowed = analyze_graph(make_graph({
+        "a": {"action": "logic_gate", "on_success": "b", "next": "a"},
+        "b": {"action": "logic_gate", "on_success": "END", "next": "a"},
+    }))
+    # Without on_success, next is the success transition.
+    fallback = analyze_graph(make_graph({
+        "a": {"action": "run_tool", "next": "b", "on_failure": "b"},
+        "b": {"action": "run_tool", "next": "a"},
+    }))
+
+    assert shadowed.acyclic
+    assert shadowed.errors() == []
+    assert fallback.success_cycles == [["a", "b"]]
+
+
+def test_missing_entry_point():
+    assert analyze_graph(make_graph({"a": {"action": "terminate"}}, entry_point="nope")).entry_missing
+
+
+def chain(count, cyclic=False):
+    nodes = {f"n{i}": {"action": "logic_gate", "next": f"n{i + 1}"} for i in range(count - 1)}
+    nodes[f"n{count - 1}"] = {"action": "logic_gate", "next": "n0"} if cyclic else {"action": "terminate"}
+    return make_graph(nodes, entry_point="n0")
+
+
+def timed_analysis(graph):
+    clear_plan_cache()
+    start = time.perf_counter()
+    analysis = analyze_graph(graph)
+    return analysis, time.perf_counter() - start
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+def test_large_graphs_are_linear_time(cyclic):
+    small = min(timed_analysis(chain(10_000, cyclic))[1] for _ in range(3))
+    analysis, large = timed_analysis(chain(100_000, cyclic))
+
+    # 10x the nodes: ~10x the time when linear (more with GC pauses), ~100x when quadratic.
+    # Absolute throughput is tracked by analyze_graph[...] in tests/benchmarks.
+    assert large < 50 * small, f"10k nodes: {small:.3f}s, 100k nodes: {large:.3f}s"
+    assert analysis.acyclic is not cyclic
+    if cyclic:
+        assert len(analysis.success_cycles[0]) == 100_000
+
+
+def test_cycle_messages_list_a_bounded_number_of_nodes():
+    analysis = analyze_graph(chain(1_000, cyclic=True))
+    nodes = analysis.success_cycles[0]
+
+    [message] = analysis.errors()
+    assert message == f"unbounded cycle: {' -> '.join(nodes[:10])} -> ... (990 more, 1000 nodes)"
@@ -0,0 +1,43 @@
+import jsonschema
+import pytest
+
+from src.core.bus import NexusBus
+
+
+def make_graph(**overrides):
+    graph = {
+        "graph_id": "g1",
+        "intent_glyph": "🤖",
+        "entry_point": "a",
+        "nodes": {"a": {"action": "terminate"}},
+    }
+    graph.update(overrides)
+    return graph
+
+
+def test_validator_is_built_once_per_process():
+    assert NexusBus()._validator is NexusBus()._validator
+
+
+def test_fast_path_rejects_unknown_action():
+    with pytest.raises(jsonschema.ValidationError, match="is not one of"):
+        NexusBus().validate_graph(make_graph(nodes={"a": {"action": "explode"}}))
+
+
+def test_full_validator_still_applies():
+    # `timeout` is not covered by the hand-written checks.
+    with pytest.raises(jsonschema.ValidationError):
+        NexusBus().validate_graph(make_graph(nodes={"a": {"action": "terminate", "timeout": "soon"}}))
+
+
+def test_resubmitted_graph_skips_validation(monkeypatch):
+    bus = NexusBus()
+    graph = make_graph(graph_id="memo")
+    bus.validate_graph(graph)
+
+    class FailingValidator:
+        def validate(self, _):
+            raise AssertionError("validator should not run for a known-valid graph")
+
+    monkeypatch.setattr(bus, "_validator", FailingValidator())
+    assert bus.validate_graph(make_graph(graph_id="memo")) is True
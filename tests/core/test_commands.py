@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from src.core.commands import INDEX_NAME, WorkflowRegistry, default_index_path, parse_commands
+
+TEMPLATE_AGENTS = os.path.join(os.path.dirname(__file__), "..", "..", "template_source", ".agents")
+
+
+@pytest.fixture
+def agents_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    target = tmp_path / ".agents"
+    shutil.copytree(TEMPLATE_AGENTS, target, ignore=shutil.ignore_patterns("*.bundle"))
+    return target
+
+
+def test_parses_the_template_command_table(agents_dir):
+    registry = WorkflowRegistry.build(str(agents_dir))
+
+    judge = registry.lookup("/judge")
+    assert judge["trigger"] == "workflows/code_review.md"
+    assert judge["argument"] == "code"
+    assert judge["agents"] == ["sentinel", "bolt", "scribe"]
+    assert judge["defaults"] == "config/defaults/code_review.md"
+    assert registry.lookup("STANDUP")["agents"] == ["brain"]
+    assert registry.lookup("/reflect")["trigger"] == "memory/TEAM_MEMORY.md"
+    assert registry.lookup("/sidebar")["trigger"] is None
+    assert registry.search("/re") == ["/refactor", "/reflect", "/refresh"]
+    assert registry.resolve("/heal  traceback.log ")[1] == "traceback.log"
+    assert registry.resolve("plain task") == (None, "plain task")
+
+
+def test_every_template_workflow_trigger_exists(agents_dir):
+    registry = WorkflowRegistry.build(str(agents_dir))
+
+    for name in registry.names():
+        path = registry.workflow_path(name)
+        assert path is None or os.path.exists(path), name
+
+
+def test_index_is_reused_until_commands_or_workflows_change(agents_dir, tmp_path, monkeypatch):
+    first = WorkflowRegistry.load(str(agents_dir))
+    index_path = default_index_path(str(agents_dir))
+    # Cached outside .agents, so scaffolding from template_source never copies it.
+    assert index_path.startswith(str(tmp_path / "cache" / "axion"))
+    assert not (agents_dir / INDEX_NAME).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("index should have been reused")
+    with monkeypatch.context() as patched:
+        patched.setattr(WorkflowRegistry, "build", classmethod(fail))
+        assert WorkflowRegistry.load(str(agents_dir)).names() == first.names()
+
+    with open(agents_dir / "COMMANDS.md", "a", encoding="utf-8") as f:
+        f.write("| **/lint** `[path]` | `workflows/lint.md` | **Bolt** runs the linters. |\n")
+    (agents_dir / "workflows" / "lint.md").write_text("# Lint\n")
+
+    rebuilt = WorkflowRegistry.load(str(agents_dir))
+    assert rebuilt.lookup("/lint")["agents"] == ["bolt"]
+    with open(index_path, encoding="utf-8") as f:
+        assert json.load(f)["commands"][0]["name"] == "/audit"
+
+
+def test_rows_that_are_not_commands_are_ignored():
+    table = "| Command | Workflow Trigger | Description |\n| :--- | :--- | :--- |\n| **/x** | `N/A` | X. |\n"
+
+    assert parse_commands(table) == [
+        {"name": "/x", "argument": None, "trigger": None, "description": "X.", "agents": []},
+    ]
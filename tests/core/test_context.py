@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.core import context
+from src.core.bundle import BUNDLE_NAME, PersonaBundle, build_bundle
+from src.core.context import ContextLoader
+
+TOGGLE_DEFCON = os.path.join(os.path.dirname(__file__), "..", "..", "template_source", "scripts", "toggle_defcon.py")
+
+
+@pytest.fixture
+def agents_root(tmp_path):
+    defaults = tmp_path / "template_source" / ".agents" / "config" / "defaults"
+    defaults.mkdir(parents=True)
+    (defaults / "brain.md").write_text("# Brain\nThinks.\n")
+    (defaults / "boom.md").write_text("# Boom\nBreaks things.\n")
+    (defaults.parent / "TECH_STACK.md").write_text("- Python\n")
+    return tmp_path
+
+
+def test_contexts_are_cached_until_a_file_changes(agents_root, monkeypatch):
+    loader = ContextLoader(str(agents_root))
+    first = loader.build_system_context("brain")
+
+    reads = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: reads.append(a[0]) or real_open(*a, **k))
+    assert loader.build_system_context("brain") == first
+    assert reads == []
+
+    stack = agents_root / "template_source" / ".agents" / "config" / "TECH_STACK.md"
+    stack.write_text("- Python\n- Rust\n")
+    updated = loader.build_system_context("brain")
+
+    assert updated["system_prompt"].endswith("- Python\n- Rust\n")
+    assert reads == [str(stack)]
+
+
+def test_defcon_toggle_is_seen_without_a_restart(agents_root):
+    loader = ContextLoader(str(agents_root))
+    assert loader.build_system_context("boom")["role"] == "boom"
+
+    subprocess.run([sys.executable, TOGGLE_DEFCON, "--status", "emergency"], cwd=agents_root,
+                   check=True, capture_output=True)
+    with pytest.raises(FileNotFoundError, match="Persona file not found"):
+        loader.build_system_context("boom")
+
+    subprocess.run([sys.executable, TOGGLE_DEFCON, "--status", "normal"], cwd=agents_root,
+                   check=True, capture_output=True)
+    assert loader.build_system_context("boom")["persona"] == "# Boom\nBreaks things.\n"
+
+
+def test_load_context_shares_one_loader():
+    context.reset_loader()
+    brain = context.load_context("brain")
+
+    assert context.get_loader() is context.get_loader()
+    assert brain["role"] == "brain"
+    assert brain["system_prompt"].startswith(brain["persona"])
+
+
+def test_bundle_serves_fresh_files_and_falls_back_for_stale_ones(agents_root, monkeypatch, new_file_mode):
+    agents_dir = agents_root / "template_source" / ".agents"
+    (agents_dir / "workflows").mkdir()
+    (agents_dir / "workflows" / "standup.md").write_text("# Standup\r\n")
+    bundle_path = build_bundle(str(agents_dir))
+    assert os.stat(bundle_path).st_mode & 0o777 == new_file_mode
+
+    bundle = PersonaBundle(bundle_path)
+    assert sorted(bundle.files) == [
+        "config/TECH_STACK.md", "config/defaults/boom.md", "config/defaults/brain.md", "workflows/standup.md",
+    ]
+    assert bytes(bundle.view("workflows/standup.md")) == b"# Standup\r\n"
+    assert bundle.text("workflows/standup.md") == "# Standup\n"
+    bundle.close()
+
+    loader = ContextLoader(str(agents_root))
+    reads = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: reads.append(a[0]) or real_open(*a, **k))
+    assert loader.build_system_context("brain")["persona"] == "# Brain\nThinks.\n"
+    assert reads == []
+
+    (agents_dir / "config" / "defaults" / "boom.md").write_text("# Boom\nRewritten.\n")
+    assert loader.load_persona("boom") == "# Boom\nRewritten.\n"
+    assert reads == [str(agents_dir / "config" / "defaults" / "boom.md")]
+
+
+def test_unreadable_bundle_is_ignored(agents_root):
+    agents_dir = agents_root / "template_source" / ".agents"
+    (agents_dir / BUNDLE_NAME).write_bytes(b"garbage")
+
+    loader = ContextLoader(str(agents_root))
+
+    assert loader.bundle is None
+    assert loader.load_persona("brain") == "# Brain\nThinks.\n"
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.analysis import GraphAnalysisError
+from src.core.bus import NexusBus
+from src.core.tools.graph_executor import GraphExecutor
+
+
+def make_graph(nodes, entry_point="start"):
+    return {
+        "graph_id": "test",
+        "intent_glyph": "🤖",
+        "entry_point": entry_point,
+        "context_delta": {},
+        "nodes": nodes,
+    }
+
+
+@pytest.fixture
+def executor():
+    return GraphExecutor(NexusBus())
+
+
+def test_execute_follows_transitions(executor):
+    executor.registry.register("ok", lambda: {"status": "success"})
+    executor.registry.register("fail", lambda: {"status": "error"})
+    graph = make_graph({
+        "start": {"action": "run_tool", "params": {"tool": "fail"}, "on_success": "a", "on_failure": "b"},
+        "a": {"action": "terminate"},
+        "b": {"action": "run_tool", "params": {"tool": "ok"}, "next": "END"},
+    })
+
+    results = executor.execute(graph)
+
+    assert list(results) == ["start", "b"]
+    assert results.status == "completed"  # the failure was handled by on_failure
+
+
+def test_explicit_on_success_end_terminates(executor):
+    executor.registry.register("ok", lambda: {"status": "success"})
+    graph = make_graph({
+        "start": {"action": "run_tool", "params": {"tool": "ok"}, "on_success": "END", "next": "after"},
+        "after": {"action": "terminate"},
+    })
+
+    assert list(executor.execute(graph)) == ["start"]
+    assert list(asyncio.run(executor.execute_async(graph))) == ["start"]
+    assert list(executor.execute_parallel(graph)) == ["start"]
+
+
+def test_run_status_reports_a_failed_last_node(executor):
+    executor.registry.register("fail", lambda: {"status": "error", "message": "boom"})
+    graph = make_graph({"start": {"action": "run_tool", "params": {"tool": "fail"}}})
+
+    assert executor.execute(graph).status == "failed"
+    assert asyncio.run(executor.execute_async(graph)).status == "failed"
+    assert executor.execute_parallel(graph).status == "failed"
+
+
+def test_execute_parallel_runs_branches_concurrently(executor):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def slow():
+        barrier.wait()
+        return {"status": "success"}
+
+    executor.registry.register("slow", slow)
+    branch = {"action": "run_tool", "params": {"tool": "slow"}, "depends_on": ["start"]}
+    graph = make_graph({
+        "start": {"action": "logic_gate", "params": {}},
+        "scan": dict(branch),
+        "test": dict(branch),
+        "lint": dict(branch),
+        "join": {"action": "terminate", "depends_on": ["scan", "test", "lint"]},
+    })
+
+    # The barrier only releases if all three branches are in flight at once.
+    results = executor.execute_parallel(graph, max_workers=3)
+
+    assert set(results) == {"start", "scan", "test", "lint", "join"}
+
+
+def test_execute_parallel_skips_dependents_of_failed_nodes(executor):
+    executor.registry.register("fail", lambda: {"status": "error"})
+    graph = make_graph({
+        "start": {"action": "run_tool", "params": {"tool": "fail"}, "on_failure": "repair"},
+        "repair": {"action": "terminate"},
+        "after": {"action": "terminate", "depends_on": ["start"]},
+    })
+
+    results = executor.execute_parallel(graph)
+
+    assert set(results) == {"start", "repair"}
+    assert results.status == "completed"
+
+
+def test_execute_async_awaits_coroutine_and_offloads_sync_tools(executor):
+    async def fetch():
+        await asyncio.sleep(0)
+        return {"status": "success"}
+
+    executor.registry.register("fetch", fetch)
+    executor.registry.register("sync", lambda: {"status": "success", "thread": threading.get_ident()})
+    graph = make_graph({
+        "start": {"action": "run_tool", "params": {"tool": "fetch"}, "on_success": "b"},
+        "b": {"action": "run_tool", "params": {"tool": "sync"}},
+    })
+
+    results = asyncio.run(executor.execute_async(graph))
+
+    assert results["start"] == {"status": "success"}
+    assert results["b"]["thread"] != threading.get_ident()
+
+
+def test_sync_invoke_runs_coroutine_tools(executor):
+    async def fetch(value):
+        return {"status": "success", "value": value}
+
+    executor.registry.register("fetch", fetch)
+
+    assert executor.registry.invoke("fetch", value=3) == {"status": "success", "value": 3}
+
+
+def test_execute_rejects_unbounded_cycles(executor):
+    graph = make_graph({
+        "start": {"action": "logic_gate", "next": "loop"},
+        "loop": {"action": "logic_gate", "next": "start"},
+    })
+
+    with pytest.raises(GraphAnalysisError, match="unbounded cycle"):
+        executor.execute(graph)
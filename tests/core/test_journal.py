@@ -0,0 +1,86 @@
+import pytest
+
+from src.core.bus import NexusBus
+from src.core.journal import ExecutionJournal
+from src.core.plan import compile_graph
+from src.core.tools.graph_executor import GraphExecutor
+
+
+def make_graph():
+    return {
+        "graph_id": "journaled",
+        "intent_glyph": "🤖",
+        "entry_point": "scan",
+        "context_delta": {},
+        "nodes": {
+            "scan": {"action": "run_tool", "params": {"tool": "scan"}, "on_success": "test"},
+            "test": {"action": "run_tool", "params": {"tool": "test"}, "on_success": "done"},
+            "done": {"action": "terminate"},
+        },
+    }
+
+
+def test_resume_continues_after_last_committed_node(tmp_path):
+    journal_path = str(tmp_path / "run.jsonl")
+    # A run that died after `scan` was committed.
+    with ExecutionJournal(journal_path) as journal:
+        journal.begin(compile_graph(make_graph()).digest, "journaled", {})
+        journal.record_node("scan", {"status": "success"}, "test", {})
+
+    calls = []
+    executor = GraphExecutor(NexusBus())
+    executor.registry.register("scan", lambda: calls.append("scan") or {"status": "success"})
+    executor.registry.register("test", lambda: calls.append("test") or {"status": "success"})
+    results = executor.resume(make_graph(), journal_path)
+
+    assert calls == ["test"]
+    assert list(results) == ["scan", "test", "done"]
+    assert ExecutionJournal.load(journal_path).finished
+
+
+def test_load_ignores_torn_final_record(tmp_path):
+    journal_path = tmp_path / "run.jsonl"
+    with ExecutionJournal(str(journal_path)) as journal:
+        journal.begin("digest", "g", {})
+        journal.record_node("a", {"status": "success"}, "b", {"retry_count": 1})
+    with open(journal_path, "a") as f:
+        f.write('{"t": "node", "node": "b", "res')
+
+    state = ExecutionJournal.load(str(journal_path))
+
+    assert state.results == {"a": {"status": "success"}}
+    assert state.next_node_id == "b"
+    assert state.context == {"retry_count": 1}
+
+
+def test_resume_rejects_a_different_graph(tmp_path):
+    journal_path = str(tmp_path / "run.jsonl")
+    GraphExecutor(NexusBus()).execute(make_graph(), journal_path=journal_path)
+    other = make_graph()
+    other["nodes"]["done"]["action"] = "logic_gate"
+
+    with pytest.raises(ValueError):
+        GraphExecutor(NexusBus()).resume(other, journal_path)
+
+
+def test_resume_after_a_torn_record_keeps_the_journal_readable(tmp_path):
+    journal_path = str(tmp_path / "run.jsonl")
+    with ExecutionJournal(journal_path) as journal:
+        journal.begin(compile_graph(make_graph()).digest, "journaled", {})
+        journal.record_node("scan", {"status": "success"}, "test", {})
+    with open(journal_path, "a") as f:
+        f.write('{"t": "node", "node": "test", "res')
+
+    executor = GraphExecutor(NexusBus())
+    executor.registry.register("scan", lambda: {"status": "success"})
+    executor.registry.register("test", lambda: {"status": "success"})
+    executor.resume(make_graph(), journal_path)
+
+    state = ExecutionJournal.load(journal_path)
+    assert state.finished
+    assert list(state.results) == ["scan", "test", "done"]
+
+
+def test_resume_requires_an_existing_journal(tmp_path):
+    with pytest.raises(FileNotFoundError, match="Cannot resume"):
+        GraphExecutor(NexusBus()).resume(make_graph(), str(tmp_path / "missing.jsonl"))
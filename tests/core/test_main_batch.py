@@ -0,0 +1,67 @@
+import io
+import json
+import sys
+
+import pytest
+
+from src import main as main_module
+from src.main import run_batch
+
+
+def test_batch_streams_ndjson_results_and_summary(tmp_path):
+    graph = {
+        "graph_id": "g1",
+        "intent_glyph": "🤖",
+        "entry_point": "a",
+        "nodes": {"a": {"action": "logic_gate", "next": "b"}, "b": {"action": "terminate"}},
+    }
+    source = tmp_path / "tasks.jsonl"
+    source.write_text(json.dumps(graph) + "\n\nnot json\n")
+    out = io.StringIO()
+
+    summary = run_batch(str(source), workers=2, out=out)
+
+    records = sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda r: r["index"])
+    assert [r["status"] for r in records] == ["success", "error"]
+    assert records[0]["nodes_run"] == 2
+    assert summary["total"] == 2
+    assert summary["failed"] == 1
+
+
+def test_batch_reports_how_each_task_run_ended(tmp_path):
+    source = tmp_path / "tasks.jsonl"
+    source.write_text(json.dumps({"task": "add caching"}) + "\n" + json.dumps({"task": "fix login"}) + "\n")
+    out = io.StringIO()
+
+    summary = run_batch(str(source), workers=1, out=out)
+
+    # The mock graph calls plan_decomposition, which no registry provides yet.
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["status"] for r in records] == ["failed", "failed"], records
+    assert records[0]["message"] == "Tool not found: plan_decomposition"
+    assert summary["failed"] == 2
+
+
+def test_single_task_mode_reports_security_errors(monkeypatch, capsys):
+    graph = main_module.generate_mock_graph("x")
+    graph["intent_glyph"] = "🛡️🤖"  # promises a security_scan step the graph does not have
+    monkeypatch.setattr(main_module, "generate_mock_graph", lambda task: graph)
+    monkeypatch.setattr(sys, "argv", ["main.py", "--task", "x"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main_module.main()
+
+    assert exit_info.value.code == 1
+    assert "Execution halted: Graph deviates from Sentinel Intent" in capsys.readouterr().out
+
+
+def test_single_task_mode_exits_non_zero_when_the_graph_fails(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["main.py", "--task", "x"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main_module.main()
+
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert "Graph failed." in output
+    assert "Mission Complete" not in output
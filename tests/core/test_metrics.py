@@ -0,0 +1,80 @@
+import asyncio
+import os
+
+import pytest
+
+from src.core.metrics import Histogram, ToolMetrics
+from src.core.tools.registry import ToolRegistry
+
+
+def test_histogram_quantiles_are_bucket_accurate():
+    histogram = Histogram(bounds=(0.01, 0.1, 1.0))
+    for _ in range(90):
+        histogram.observe(0.005)
+    for _ in range(9):
+        histogram.observe(0.05)
+    histogram.observe(3.0)
+
+    assert 0 < histogram.quantile(0.50) <= 0.01
+    assert 0.01 < histogram.quantile(0.95) <= 0.1
+    assert histogram.quantile(1.0) == 3.0
+    assert histogram.counts == [90, 9, 0, 1]
+
+
+def test_registry_records_calls_errors_and_latency():
+    metrics = ToolMetrics()
+    registry = ToolRegistry(metrics=metrics)
+    registry.register("ok", lambda: {"status": "success"})
+    registry.register("bad", lambda: {"status": "error", "message": "nope"})
+
+    async def fetch():
+        return {"status": "success"}
+    registry.register("fetch", fetch)
+
+    registry.invoke("ok")
+    registry.invoke("ok")
+    registry.invoke("bad")
+    registry.invoke("missing")
+    asyncio.run(registry.ainvoke("fetch"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["ok"]["calls"] == 2 and snapshot["ok"]["errors"] == 0
+    assert snapshot["bad"]["error_rate"] == 1.0
+    assert snapshot["missing"]["errors"] == 1
+    assert snapshot["fetch"]["calls"] == 1
+    assert set(snapshot["ok"]["latency_s"]) == {"p50", "p95", "p99", "mean", "max"}
+
+
+def test_state_merges_across_collectors():
+    worker, parent = ToolMetrics(), ToolMetrics()
+    worker.observe("scan", 0.002)
+    worker.observe("scan", 0.2, error=True)
+    parent.observe("scan", 0.002)
+
+    parent.merge_state(worker.export_state(reset=True))
+
+    assert parent.snapshot()["scan"]["calls"] == 3
+    assert parent.snapshot()["scan"]["errors"] == 1
+    assert worker.snapshot() == {}
+    with pytest.raises(ValueError):
+        ToolMetrics(bounds=(1.0,)).merge_state(parent.export_state())
+
+
+def test_prometheus_text_file(tmp_path, new_file_mode):
+    metrics = ToolMetrics(bounds=(0.1, 1.0))
+    metrics.observe('odd"name', 0.05)
+    metrics.observe('odd"name', 0.5, error=True)
+    path = tmp_path / "axion.prom"
+
+    metrics.write_prometheus(str(path))
+
+    lines = path.read_text().splitlines()
+    assert '# TYPE axion_tool_latency_seconds histogram' in lines
+    assert 'axion_tool_calls_total{tool="odd\\"name"} 2' in lines
+    assert 'axion_tool_errors_total{tool="odd\\"name"} 1' in lines
+    assert 'axion_tool_latency_seconds_bucket{tool="odd\\"name",le="0.1"} 1' in lines
+    assert 'axion_tool_latency_seconds_bucket{tool="odd\\"name",le="+Inf"} 2' in lines
+    assert 'axion_tool_latency_seconds_count{tool="odd\\"name"} 2' in lines
+    assert [p.name for p in tmp_path.iterdir()] == ["axion.prom"]
+    assert os.stat(path).st_mode & 0o777 == new_file_mode
+
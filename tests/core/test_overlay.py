@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from src.core.bus import NexusBus
+from src.core.tools.graph_executor import GraphExecutor
+from src.core.tools.overlay import transaction
+from src.core.tools.system import read_file, write_file
+
+
+def test_transaction_serves_reads_from_memory_and_commits(workspace):
+    with transaction() as overlay:
+        write_file("out/a.txt", "staged")
+        assert read_file("out/a.txt")["content"] == "staged"
+        assert not (workspace / "out" / "a.txt").exists()
+        assert len(overlay.pending()) == 1
+
+    assert (workspace / "out" / "a.txt").read_text() == "staged"
+
+
+def test_transaction_discards_on_error(workspace):
+    with pytest.raises(RuntimeError):
+        with transaction():
+            write_file("a.txt", "staged")
+            raise RuntimeError("graph failed")
+
+    assert not (workspace / "a.txt").exists()
+
+
+def test_commit_keeps_file_permissions(workspace, new_file_mode, monkeypatch):
+    # The process umask is never touched: other threads may be creating files.
+    monkeypatch.setattr(os, "umask", lambda *a: pytest.fail("os.umask called"))
+    existing = workspace / "script.sh"
+    existing.write_text("old")
+    os.chmod(existing, 0o750)
+
+    with transaction():
+        write_file("script.sh", "new")
+        write_file("fresh.txt", "new")
+
+    assert os.stat(existing).st_mode & 0o777 == 0o750
+    assert os.stat(workspace / "fresh.txt").st_mode & 0o777 == new_file_mode
+
+
+def make_graph(last_tool):
+    return {
+        "graph_id": "tx",
+        "intent_glyph": "🤖",
+        "entry_point": "write",
+        "nodes": {
+            "write": {"action": "run_tool", "params": {"tool": "write_file",
+                                                       "args": {"path": "plan.txt", "content": "plan"}},
+                      "on_success": "check"},
+            "check": {"action": "run_tool", "params": {"tool": last_tool}},
+        },
+    }
+
+
+@pytest.mark.parametrize("last_tool, committed", [("ok", True), ("fail", False)])
+def test_transactional_execute_commits_only_successful_runs(workspace, last_tool, committed):
+    executor = GraphExecutor(NexusBus())
+    executor.registry.register("write_file", write_file)
+    executor.registry.register("ok", lambda: {"status": "success"})
+    executor.registry.register("fail", lambda: {"status": "error"})
+
+    executor.execute(make_graph(last_tool), transactional=True)
+
+    assert (workspace / "plan.txt").exists() is committed
@@ -0,0 +1,37 @@
+from src.core.plan import MISSING_NODE, NO_NODE, TERMINATE, compile_graph
+
+
+def make_graph(graph_id="g1"):
+    return {
+        "graph_id": graph_id,
+        "entry_point": "a",
+        "nodes": {
+            "a": {"action": "run_tool", "params": {"tool": "x"}, "on_success": "b", "on_failure": "ghost"},
+            "b": {"action": "terminate", "next": "END", "depends_on": ["a"]},
+        },
+    }
+
+
+def test_compile_resolves_transitions_to_indexes():
+    plan = compile_graph(make_graph())
+    a, b = plan.nodes
+
+    assert plan.entry == a.index
+    assert a.on_success == b.index
+    assert a.on_failure == MISSING_NODE
+    assert b.next == NO_NODE
+    assert b.action_code == TERMINATE
+    assert b.depends_on == (a.index,)
+    assert a.dependents == (b.index,)
+    assert plan.dangling == [("a", "on_failure", "ghost")]
+
+
+def test_plans_are_cached_by_content_not_graph_id():
+    first = compile_graph(make_graph("g1"))
+    second = compile_graph(make_graph("g2"))
+
+    changed = make_graph()
+    changed["nodes"]["b"]["action"] = "logic_gate"
+
+    assert first is second
+    assert compile_graph(changed) is not first
@@ -0,0 +1,91 @@
+from src.core.context import ContextLoader
+from src.core.prompt import estimate_tokens, split_sections
+
+PERSONA = """Intro line.
+# Brain
+Core directive.
+## Rules
+""" + "Always validate. " * 20 + """
+```bash
+# not a heading
+```
+### Examples
+""" + "Example text. " * 40 + """
+## Tone
+Be brief.
+"""
+
+
+def test_sections_round_trip_and_skip_fenced_headings():
+    sections = split_sections(PERSONA)
+
+    assert "".join(s.text for s in sections) == PERSONA
+    assert [(s.title, s.level) for s in sections] == [
+        ("", 0), ("Brain", 1), ("Rules", 2), ("Examples", 3), ("Tone", 2),
+    ]
+    assert [s.parent for s in sections] == [None, None, 1, 2, 1]
+
+
+def test_token_estimate_is_cheap_and_conservative():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("🧠 ok") == 1 + 1
+
+
+def test_budget_keeps_high_priority_sections_and_reports_the_rest(tmp_path):
+    config = tmp_path / ".agents" / "config"
+    (config / "defaults").mkdir(parents=True)
+    (config / "defaults" / "brain.md").write_text(PERSONA)
+    (config / "TECH_STACK.md").write_text("# Stack\n- Python\n## Details\n" + "Version notes. " * 60)
+    loader = ContextLoader(str(tmp_path))
+    full = loader.build_system_context("brain")
+
+    roomy = loader.build_system_context("brain", token_budget=10_000)
+    tight = loader.build_system_context("brain", token_budget=200)
+    steered = loader.build_system_context("brain", token_budget=250, priorities={"Examples": 0, "Rules": 0})
+
+    assert roomy["system_prompt"] == full["system_prompt"]
+    assert roomy["dropped_sections"] == []
+
+    assert tight["estimated_tokens"] <= 200
+    assert "Core directive." in tight["system_prompt"]
+    assert "## Technology Stack\n# Stack\n- Python\n" in tight["system_prompt"]
+    dropped = {(d["source"], d["title"]) for d in tight["dropped_sections"]}
+    assert ("persona", "Examples") in dropped
+    assert ("tech_stack", "Details") in dropped
+
+    # Children are never kept without their parent.
+    assert "Example text." in steered["system_prompt"]
+    assert "## Rules" in steered["system_prompt"]
+
+
+def test_context_delta_sends_only_changed_sections(tmp_path):
+    config = tmp_path / ".agents" / "config"
+    (config / "defaults").mkdir(parents=True)
+    (config / "defaults" / "brain.md").write_text(PERSONA)
+    stack = config / "TECH_STACK.md"
+    stack.write_text("# Stack\n## Python\n3.11\n## Rust\n1.80\n## Notes\na\n## Notes\nb\n")
+    loader = ContextLoader(str(tmp_path))
+
+    first = loader.build_system_context("brain")
+    assert list(first["section_hashes"])[-4:] == [
+        "tech_stack:Stack/Python", "tech_stack:Stack/Rust", "tech_stack:Stack/Notes", "tech_stack:Stack/Notes~2",
+    ]
+    assert loader.context_delta("brain", first["section_hashes"])["changed"] == []
+
+    stack.write_text("# Stack\n## Python\n3.12\n## Notes\na\n## Notes\nb\n## Go\n1.22\n")
+    delta = loader.context_delta("brain", first["section_hashes"])
+
+    assert delta["changed"] == [{"id": "tech_stack:Stack/Python", "text": "## Python\n3.12\n"}]
+    assert delta["added"] == [{"id": "tech_stack:Stack/Go", "text": "## Go\n1.22\n"}]
+    assert delta["removed"] == ["tech_stack:Stack/Rust"]
+
+    # The receiver can rebuild the full prompt from what it already had plus the delta.
+    known = {s.path: s.text for s in split_sections(PERSONA)}
+    texts = {f"persona:{path}": text for path, text in known.items()}
+    texts["header:Technology Stack"] = "\n\n## Technology Stack\n"
+    texts.update({"tech_stack:Stack": "# Stack\n", "tech_stack:Stack/Notes": "## Notes\na\n",
+                  "tech_stack:Stack/Notes~2": "## Notes\nb\n"})
+    texts.update({item["id"]: item["text"] for item in delta["added"] + delta["changed"]})
+    rebuilt = "".join(texts[section_id] for section_id in delta["order"])
+    assert rebuilt == loader.build_system_context("brain")["system_prompt"]
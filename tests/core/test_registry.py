@@ -0,0 +1,349 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.metrics import ToolMetrics
+from src.core.tools.cache import ResultCache
+from src.core.tools.limits import Slots, TokenBucket
+from src.core.tools.registry import ToolRegistry
+
+
+def checksum(data, rounds=1):
+    value = 0
+    for _ in range(rounds):
+        for ch in data:
+            value = (value * 31 + ord(ch)) % 1_000_003
+    return {"status": "success", "value": value, "pid": os.getpid()}
+
+
+def crash():
+    os._exit(3)
+
+
+def stall(seconds):
+    time.sleep(seconds)
+    return {"status": "success"}
+
+
+def counting_tool(calls):
+    def tool(task):
+        calls.append(task)
+        return {"status": "success", "plan": [task]}
+    return tool
+
+
+def test_pure_tools_are_cached_by_arguments():
+    calls = []
+    registry = ToolRegistry()
+    registry.register("plan_decomposition", counting_tool(calls), pure=True)
+
+    first = registry.invoke("plan_decomposition", task="a")
+    first["plan"].append("mutated")
+    second = registry.invoke("plan_decomposition", task="a")
+    registry.invoke("plan_decomposition", task="b")
+
+    assert calls == ["a", "b"]
+    assert second == {"status": "success", "plan": ["a"]}
+    assert registry.cache.stats()["hits"] == 1
+
+
+def test_impure_tools_and_errors_are_not_cached():
+    calls = []
+    registry = ToolRegistry()
+    registry.register("plain", counting_tool(calls))
+    registry.register("flaky", lambda: calls.append("flaky") or {"status": "error"}, pure=True)
+
+    registry.invoke("plain", task="a")
+    registry.invoke("plain", task="a")
+    registry.invoke("flaky")
+    registry.invoke("flaky")
+
+    assert calls == ["a", "a", "flaky", "flaky"]
+
+
+def test_cache_evicts_by_size_and_ttl():
+    cache = ResultCache(max_entries=1, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+    time.sleep(0.06)
+    assert cache.get("b") == (False, None)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).put("key", {"status": "success"})
+
+    restarted = ResultCache(disk_dir=str(tmp_path))
+
+    assert restarted.get("key") == (True, {"status": "success"})
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_bounded_and_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(max_entries=1, disk_dir=str(tmp_path), max_disk_entries=10)
+    for i in range(10):
+        cache.put(f"k{i}", i)
+        os.utime(tmp_path / f"k{i}.json", (i, i))
+    assert cache.get("k0") == (True, 0)  # read back from disk: now the most recently used
+
+    cache.put("k10", 10)
+
+    assert len(list(tmp_path.glob("*.json"))) == 9
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["k0", "k10"] + [f"k{i}" for i in range(3, 10)]
+
+
+def test_results_that_do_not_round_trip_through_json_are_not_cached():
+    registry = ToolRegistry()
+    calls = []
+
+    def pair(x):
+        calls.append(x)
+        return {"status": "success", "pair": (x, x), "by_id": {x: "ok"}}
+
+    registry.register("pair", pair, pure=True)
+
+    first = registry.invoke("pair", x=1)
+    second = registry.invoke("pair", x=1)
+
+    assert first == second == {"status": "success", "pair": (1, 1), "by_id": {1: "ok"}}
+    assert len(calls) == 2
+    assert ResultCache().put("k", [1, 2]) is True
+    assert ResultCache().put("k", (1, 2)) is False
+
+
+def test_bulkhead_caps_concurrent_calls_and_reports_queue_wait():
+    registry = ToolRegistry()
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def scan():
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return {"status": "success"}
+
+    registry.register("run_command", scan, max_concurrency=2)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: registry.invoke("run_command"), range(6)))
+
+    stats = registry.queue_stats()["run_command"]
+    assert state["peak"] == 2
+    assert stats["calls"] == 6
+    assert stats["max_wait_s"] > 0
+
+
+def test_global_budget_applies_across_tools():
+    registry = ToolRegistry(max_concurrency=1)
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def tool():
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return {"status": "success"}
+
+    registry.register("a", tool)
+    registry.register("b", tool)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(registry.invoke, ["a", "b"] * 3))
+
+    stats = registry.queue_stats()
+    assert state["peak"] == 1
+    assert stats["a"]["calls"] == stats["b"]["calls"] == 3
+    assert max(stats["a"]["max_wait_s"], stats["b"]["max_wait_s"]) > 0
+
+
+@pytest.mark.parametrize("rate, burst", [(0, None), (-1, None), (10, 0), (10, 0.5)])
+def test_token_bucket_rejects_limits_that_never_admit_a_call(rate, burst):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, burst)
+
+
+def test_token_bucket_spaces_out_calls():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.take()
+
+    assert time.monotonic() - start >= 3 / 50 * 0.9
+
+
+def test_async_admission_does_not_block_the_loop():
+    registry = ToolRegistry()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return {"status": "success"}
+
+    registry.register("fetch", fetch, max_concurrency=1)
+
+    async def main():
+        return await asyncio.gather(*(registry.ainvoke("fetch") for _ in range(3)))
+
+    assert asyncio.run(main()) == [{"status": "success"}] * 3
+
+
+def test_slots_hand_off_between_threads_and_coroutines_in_arrival_order():
+    slots = Slots(1)
+    slots.acquire()
+    order = []
+
+    def blocked_thread():
+        slots.acquire()
+        order.append("thread")
+        slots.release()
+
+    async def main():
+        async def waiter(name):
+            await slots.acquire_async()
+            order.append(name)
+            slots.release()
+
+        first = asyncio.create_task(waiter("first"))
+        await asyncio.sleep(0.01)
+        thread = threading.Thread(target=blocked_thread)
+        thread.start()
+        await asyncio.sleep(0.01)
+        cancelled = asyncio.create_task(waiter("cancelled"))
+        last = asyncio.create_task(waiter("last"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+
+        slots.release()
+        await asyncio.gather(first, last, return_exceptions=True)
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+
+    assert order == ["first", "thread", "last"]
+    slots.acquire()  # the cancelled waiter did not leak the slot
+    with pytest.raises(ValueError):
+        Slots(1).release()
+
+
+def test_queue_wait_is_recorded_in_tool_metrics():
+    metrics = ToolMetrics()
+    registry = ToolRegistry(metrics=metrics)
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return {"status": "success"}
+
+    registry.register("fetch", fetch, max_concurrency=1)
+    registry.register("free", lambda: {"status": "success"})
+
+    async def main():
+        return await asyncio.gather(*(registry.ainvoke("fetch") for _ in range(3)))
+
+    asyncio.run(main())
+    registry.invoke("free")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["fetch"]["queue_wait_s"]["max"] >= 0.03
+    assert "queue_wait_s" not in snapshot["free"]
+    assert 'axion_tool_queue_wait_seconds_count{tool="fetch"} 3' in metrics.prometheus_text().splitlines()
+
+
+def test_lazy_tools_import_on_first_invoke(tmp_path, monkeypatch):
+    package = tmp_path / "lazy_tools_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "heavy.py").write_text("def scan(target):\n    return {'status': 'success', 'target': target}\n")
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"tools": [{"name": "scan", "import": "lazy_tools_pkg.heavy:scan", "pure": True}]}))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = ToolRegistry()
+    registry.load_manifest(str(manifest))
+
+    assert "scan" in registry
+    assert "lazy_tools_pkg.heavy" not in sys.modules
+    assert registry.invoke("scan", target="src") == {"status": "success", "target": "src"}
+    assert "lazy_tools_pkg.heavy" in sys.modules
+    registry.invoke("scan", target="src")
+    assert registry.cache.stats()["hits"] == 1
+
+
+def test_lookup_rechecks_under_the_lock_after_a_stale_miss():
+    class StaleFirstRead(dict):
+        """Misses once, like a read taken just before another thread finished the import."""
+        stale = True
+
+        def get(self, key, default=None):
+            if self.stale:
+                self.stale = False
+                return default
+            return super().get(key, default)
+
+    registry = ToolRegistry()
+    registry.register_lazy("read_file", ".system:read_file")
+    registry.invoke("read_file", path="missing.txt")
+    registry._tools = StaleFirstRead(registry._tools)
+
+    assert registry.invoke("read_file", path="missing.txt")["message"] != "Tool not found: read_file"
+
+
+def test_default_manifest_resolves_builtin_tools():
+    registry = ToolRegistry.with_default_tools()
+
+    assert registry.invoke("read_file", path="/etc/hostname")["status"] == "error"  # outside the sandbox
+    assert registry.invoke("missing")["message"] == "Tool not found: missing"
+
+
+def test_process_isolated_tools_run_in_persistent_workers():
+    registry = ToolRegistry(process_workers=1)
+    registry.register("checksum", checksum, isolation="process")
+    try:
+        first = registry.invoke("checksum", data="axion")
+        second = registry.invoke("checksum", data="axion", rounds=2)
+
+        assert first["status"] == "success"
+        assert first["value"] == checksum("axion")["value"]
+        assert first["pid"] != os.getpid()
+        assert second["pid"] == first["pid"]
+    finally:
+        registry.close()
+
+
+def test_process_worker_crash_and_timeout_are_errors_and_workers_restart():
+    registry = ToolRegistry(process_workers=1)
+    registry.register("crash", crash, isolation="process")
+    registry.register("stall", stall, isolation="process", timeout=0.5)
+    registry.register("checksum", checksum, isolation="process")
+    try:
+        crashed = registry.invoke("crash")
+        assert crashed["status"] == "error"
+        assert "exit code 3" in crashed["message"]
+
+        assert registry.invoke("stall", seconds=10)["message"] == "Tool timed out after 0.5s"
+        assert registry.invoke("checksum", data="x")["status"] == "success"
+    finally:
+        registry.close()
+
+
+def test_process_isolation_requires_a_module_level_function():
+    registry = ToolRegistry()
+    with pytest.raises(ValueError, match="module-level"):
+        registry.register("inline", lambda: None, isolation="process")
+
+
+def test_timeout_without_process_isolation_is_rejected():
+    registry = ToolRegistry()
+    with pytest.raises(ValueError, match="timeout is only enforced"):
+        registry.register("stall", stall, timeout=0.5)
+    assert "stall" not in registry
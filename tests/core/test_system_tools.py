@@ -0,0 +1,241 @@
+import os
+import subprocess
+
+import pytest
+
+from src.core.tools import sandbox
+from src.core.tools import fileio, system
+from src.core.tools.system import (
+    BoundedOutput, CommandStream, iter_file_chunks, read_file, remove_spill, run_command, write_file,
+)
+
+
+@pytest.fixture
+def local_pool(tmp_path):
+    pool = sandbox.configure_sandbox_pool(backend="local", size=2, max_uses=2, workspace=str(tmp_path))
+    yield pool
+    sandbox.shutdown_sandbox_pool()
+
+
+def test_run_command_uses_warm_pool(local_pool, tmp_path):
+    (tmp_path / "marker.txt").write_text("hi")
+
+    assert run_command("cat marker.txt") == {"status": "success", "output": "hi"}
+    assert run_command("exit 3")["exit_code"] == 3
+
+
+def test_pool_recycles_workers_after_max_uses(local_pool):
+    pids = [run_command("echo $PPID")["output"] for _ in range(3)]
+
+    # max_uses=2: the third command lands in a fresh worker process.
+    assert pids[0] == pids[1] != pids[2]
+
+
+def test_pool_replaces_crashed_worker(local_pool):
+    first = run_command("echo $PPID")["output"]
+    worker, _, _ = local_pool._idle.get_nowait()
+    worker.process.kill()
+    worker.process.wait()
+    local_pool._idle.put((worker, 0, 0.0))  # idle long enough to be health-checked
+
+    assert run_command("echo $PPID")["output"] != first
+
+
+def test_pool_defaults_to_the_sandbox_root(workspace, monkeypatch):
+    monkeypatch.chdir("/")
+    pool = sandbox.SandboxPool(backend="local")
+
+    assert pool.workspace == str(workspace.resolve())
+
+
+def test_pool_is_shut_down_at_exit(monkeypatch, tmp_path):
+    hooks = []
+    monkeypatch.setattr(sandbox.atexit, "register", hooks.append)
+    monkeypatch.setattr(sandbox, "_atexit_registered", False)
+
+    sandbox.configure_sandbox_pool(backend="local", workspace=str(tmp_path))
+    sandbox.configure_sandbox_pool(backend="local", workspace=str(tmp_path))
+    sandbox.shutdown_sandbox_pool()
+
+    assert hooks == [sandbox.shutdown_sandbox_pool]
+
+
+def test_containers_are_labelled_and_strays_reaped(monkeypatch):
+    calls = []
+
+    def fake_run(argv, **kwargs):
+        calls.append(argv)
+        stdout = "cid\n"
+        if argv[:2] == ["docker", "ps"]:
+            stdout = f"live {os.getpid()}\ndead 999999999\n"
+        return subprocess.CompletedProcess(argv, 0, stdout, "")
+
+    monkeypatch.setattr(sandbox.subprocess, "run", fake_run)
+    sandbox.DockerWorker("/work")
+
+    assert f"{sandbox.SANDBOX_LABEL}={os.getpid()}" in calls[0]
+    assert sandbox.reap_stray_containers() == ["dead"]
+    assert calls[-1] == ["docker", "rm", "-f", "dead"]
+
+
+def test_command_stream_yields_incrementally_and_bounds_memory():
+    stream = CommandStream(
+        ["/bin/sh", "-c", "echo start; head -c 100000 /dev/zero | tr '\\0' x; echo; echo end; echo oops >&2"],
+        head_bytes=16, tail_bytes=16,
+    )
+
+    chunks = list(stream)
+    result = stream.result()
+
+    assert stream.exit_code == 0
+    assert "".join(text for name, text in chunks if name == "stdout").startswith("start\n")
+    assert ("stderr", "oops\n") in chunks
+    assert result["truncated"] is True
+    assert result["total_bytes"] == 100011
+    assert result["output"].startswith("start\nxxxxxxxxxx")
+    assert result["output"].endswith("xxxx\nend\n")
+    with open(result["spill_path"], "rb") as f:
+        assert len(f.read()) >= 100011 - 16 - 32
+    assert stream.stderr.spill_path is None
+    remove_spill(result)
+    assert not os.path.exists(result["spill_path"])
+
+
+@pytest.mark.parametrize("size, chunk", [(25, 25), (25, 1), (1000, 7)])
+def test_bounded_output_spills_every_elided_byte(size, chunk):
+    data = bytes(ord("a") + i % 26 for i in range(size))
+    output = BoundedOutput(10, 10)
+    for i in range(0, size, chunk):
+        output.write(data[i:i + chunk])
+    output.close()
+    output.close()
+
+    with open(output.spill_path, "rb") as f:
+        assert f.read() == data[10:-10]
+    os.remove(output.spill_path)
+    assert f"{size - 20} bytes omitted, full middle section in {output.spill_path}" in output.text()
+    assert output.text().endswith(data[-10:].decode())
+
+
+def test_bounded_output_windows_end_on_character_boundaries():
+    data = "é" * 50  # two bytes each: odd window sizes land mid-character
+    output = BoundedOutput(11, 11)
+    for i in range(0, len(data.encode()), 3):
+        output.write(data.encode()[i:i + 3])
+    output.close()
+
+    text = output.text()
+    with open(output.spill_path, "rb") as f:
+        middle = f.read().decode()
+    head, _, tail = text.partition("\n... [")
+    assert head == "é" * 5
+    assert tail.endswith("] ...\n" + "é" * 5)
+    assert head + middle + "é" * 5 == data
+    assert "\ufffd" not in text
+
+    spill_path = output.spill_path
+    output.discard()
+    assert not os.path.exists(spill_path)
+    assert "spill file discarded" in output.text()
+
+
+def test_read_file_line_and_byte_ranges(workspace):
+    (workspace / "log.txt").write_text("one\ntwo\nthree\nfour\n")
+
+    lines = read_file("log.txt", start_line=2, end_line=3)
+    page = read_file("log.txt", offset=4, length=3)
+
+    assert lines["content"] == "two\nthree\n"
+    assert lines["total_lines"] == 4
+    assert page["content"] == "two"
+    assert page["next_offset"] == 7
+    assert page["truncated"] is True
+
+
+def test_line_index_is_rebuilt_when_file_changes(workspace):
+    target = workspace / "log.txt"
+    target.write_text("a\nb\n")
+    assert read_file("log.txt", start_line=2)["content"] == "b\n"
+
+    target.write_text("a\nb\nc\n")
+    assert read_file("log.txt", start_line=3)["content"] == "c\n"
+
+
+def test_large_files_are_paged_unless_full_is_requested(workspace, monkeypatch):
+    monkeypatch.setattr(system, "LARGE_FILE_BYTES", 8)
+    monkeypatch.setattr(fileio, "MMAP_THRESHOLD", 8)
+    (workspace / "big.txt").write_text("0123456789abcdef")
+
+    paged = read_file("big.txt")
+
+    assert paged["content"] == "01234567"
+    assert paged["truncated"] is True
+    assert read_file("big.txt", full=True)["content"] == "0123456789abcdef"
+    assert b"".join(iter_file_chunks("big.txt", chunk_size=5)) == b"0123456789abcdef"
+
+
+def test_read_cache_is_validated_by_stat_and_invalidated_by_writes(workspace):
+    fileio.content_cache.clear()
+    target = workspace / "persona.md"
+    target.write_text("v1")
+
+    assert read_file("persona.md")["content"] == "v1"
+    assert read_file(str(target))["content"] == "v1"
+    assert fileio.content_cache.stats()["hits"] == 1
+
+    write_file("persona.md", "v2")
+    assert read_file("persona.md")["content"] == "v2"
+
+    # Same size, edited behind our back: the new mtime forces a re-read.
+    target.write_text("v3")
+    os.utime(target, ns=(0, target.stat().st_mtime_ns + 1_000_000))
+    assert read_file("persona.md")["content"] == "v3"
+
+
+def test_byte_pages_never_split_characters(workspace):
+    (workspace / "accents.txt").write_text("é" * 10, encoding="utf-8")
+
+    pages, offset = [], 0
+    while True:
+        page = read_file("accents.txt", offset=offset, length=5)
+        pages.append(page["content"])
+        offset = page["next_offset"]
+        if not page["truncated"]:
+            break
+
+    assert pages == ["éé"] * 5
+    assert read_file("accents.txt", offset=1, length=3) == {
+        "status": "success", "content": "é", "offset": 2, "next_offset": 4, "size": 20, "truncated": True,
+    }
+
+
+def test_large_files_page_losslessly(workspace):
+    text = ("ascii line\r\n" + "€uro ✓\n") * 90_000
+    (workspace / "big.txt").write_bytes(text.encode("utf-8"))
+
+    pages, offset = [], 0
+    while True:
+        page = read_file("big.txt", offset=offset)
+        pages.append(page["content"])
+        offset = page["next_offset"]
+        if not page["truncated"]:
+            break
+
+    assert len(pages) > 1
+    assert "".join(pages) == read_file("big.txt", full=True)["content"] == text.replace("\r\n", "\n")
+
+
+def test_every_read_mode_translates_newlines_alike(workspace):
+    (workspace / "crlf.txt").write_bytes(b"a\r\nb\r\n")
+
+    assert read_file("crlf.txt")["content"] == "a\nb\n"
+    assert read_file("crlf.txt", start_line=1, end_line=2)["content"] == "a\nb\n"
+    assert read_file("crlf.txt", offset=0, length=6)["content"] == "a\nb\n"
+    assert read_file("crlf.txt", offset=0, length=2)["next_offset"] == 1  # "\r\n" stays whole
+
+
+def test_sandbox_root_is_resolved_once(workspace, monkeypatch):
+    monkeypatch.chdir("/")
+
+    assert read_file("../outside.txt")["message"].startswith("Sandboxing Violation")
+    assert read_file("missing.txt")["message"] == "File not found"
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from src.core import tracing
+from src.core.bus import NexusBus
+from src.core.tools.graph_executor import GraphExecutor
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable(capacity=128)
+    yield tracer
+    tracing.disable()
+
+
+def test_spans_cover_graph_nodes_and_tools(tracer, tmp_path):
+    executor = GraphExecutor(NexusBus())
+    executor.registry.register("lint", lambda: {"status": "success"})
+    graph = {
+        "graph_id": "traced",
+        "intent_glyph": "🤖",
+        "entry_point": "a",
+        "nodes": {"a": {"action": "run_tool", "params": {"tool": "lint"}}},
+    }
+
+    executor.bus.validate_graph(graph)
+    executor.execute(graph)
+
+    cats = [(span["cat"], span["name"]) for span in tracer.spans()]
+    assert cats == [("validation", "validate_graph"), ("tool", "lint"), ("node", "a"), ("graph", "graph")]
+
+    chrome_path = tmp_path / "trace.json"
+    tracer.export_chrome(str(chrome_path))
+    events = json.loads(chrome_path.read_text())["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    assert all(event["dur"] >= 0 for event in events)
+
+
+def test_ring_buffer_keeps_newest_spans():
+    tracer = tracing.enable(capacity=2)
+    try:
+        for name in ("a", "b", "c"):
+            with tracing.span(name):
+                pass
+    finally:
+        tracing.disable()
+
+    assert [span["name"] for span in tracer.spans()] == ["b", "c"]
+
+
+def test_disabled_tracing_returns_shared_noop():
+    assert tracing.span("x") is tracing.span("y")
@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from src.core.tools import sandbox, workspace
+from src.core.tools.system import configure_sandbox_root, run_command
+from src.core.tools.workspace import WorkspaceHasher, blob_digest, read_git_index
+
+AN_HOUR_AGO_NS = time.time_ns() - 3600 * 1_000_000_000
+
+
+def make_tree(root):
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("print('hi')\n")
+    (root / "README.md").write_text("readme\n")
+    (root / "__pycache__").mkdir()
+    (root / "__pycache__" / "app.pyc").write_bytes(b"\0")
+    for path in (root / "src" / "app.py", root / "README.md"):
+        os.utime(path, ns=(AN_HOUR_AGO_NS, AN_HOUR_AGO_NS))
+
+
+def test_hasher_rereads_only_changed_files(tmp_path):
+    make_tree(tmp_path)
+    hasher = WorkspaceHasher(str(tmp_path))
+
+    first = hasher.digest()
+    assert hasher.files_read == 2  # __pycache__ is skipped
+    assert hasher.digest() == first
+    assert hasher.files_read == 2
+
+    (tmp_path / "README.md").write_text("changed\n")
+    changed = hasher.digest()
+    assert changed != first
+    assert hasher.files_read == 3
+
+    (tmp_path / "README.md").unlink()
+    assert hasher.digest() not in (first, changed)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_hasher_takes_digests_from_the_git_index(tmp_path):
+    make_tree(tmp_path)
+    plain = WorkspaceHasher(str(tmp_path)).digest()
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "src/app.py", "README.md"], cwd=tmp_path, check=True)
+
+    index = read_git_index(str(tmp_path / ".git" / "index"))
+    hasher = WorkspaceHasher(str(tmp_path))
+    st = os.stat(tmp_path / "src" / "app.py")
+
+    assert index["src/app.py"][-1] == blob_digest(b"print('hi')\n")
+    assert index["src/app.py"][:6] == (
+        st.st_ctime_ns // 1_000_000_000, st.st_ctime_ns % 1_000_000_000,
+        st.st_mtime_ns // 1_000_000_000, st.st_mtime_ns % 1_000_000_000, st.st_ino, st.st_size,
+    )
+    assert hasher.digest() != plain  # HEAD and the index are part of the digest
+    assert hasher.files_read == 0
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_git_state_is_part_of_the_digest(tmp_path):
+    make_tree(tmp_path)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+    hasher = WorkspaceHasher(str(tmp_path))
+
+    digests = [hasher.digest()]
+    subprocess.run(git + ["add", "README.md"], cwd=tmp_path, check=True)
+    digests.append(hasher.digest())
+    subprocess.run(git + ["commit", "-qm", "first"], cwd=tmp_path, check=True)
+    digests.append(hasher.digest())
+    subprocess.run(git + ["checkout", "-qb", "topic"], cwd=tmp_path, check=True)
+    digests.append(hasher.digest())
+
+    assert len(set(digests)) == 4
+    assert hasher.digest() == digests[-1]
+
+
+@pytest.fixture
+def cached_commands(tmp_path):
+    configure_sandbox_root(str(tmp_path))
+    sandbox.configure_sandbox_pool(backend="local", size=1, workspace=str(tmp_path))
+    cache = workspace.configure_command_cache()
+    yield cache
+    workspace.disable_command_cache()
+    sandbox.shutdown_sandbox_pool()
+    configure_sandbox_root()
+
+
+def test_run_command_replays_results_for_an_unchanged_workspace(cached_commands, tmp_path):
+    (tmp_path / "input.txt").write_text("v1")
+
+    first = run_command("cat input.txt; echo; date +%s%N")
+    again = run_command("cat input.txt; echo; date +%s%N")
+    failed = run_command("cat input.txt; exit 4")
+    failed_again = run_command("cat input.txt; exit 4")
+
+    assert again == {**first, "cached": True}
+    assert failed_again == {**failed, "cached": True}
+    assert failed_again["exit_code"] == 4
+
+    (tmp_path / "input.txt").write_text("v2")
+    fresh = run_command("cat input.txt; echo; date +%s%N")
+    assert fresh["output"].startswith("v2")
+    assert "cached" not in fresh
+
+
+def test_commands_that_modify_the_workspace_are_not_cached(cached_commands, tmp_path):
+    run_command("echo x >> log.txt")
+    run_command("echo x >> log.txt")
+
+    assert (tmp_path / "log.txt").read_text() == "x\nx\n"
+    assert cached_commands.results.stats()["size"] == 0